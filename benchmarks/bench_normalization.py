@@ -0,0 +1,57 @@
+"""
+Micro-benchmark da limpeza de texto do pré-processamento (antes do SpaCy).
+
+Compara a implementação anterior (regex recompilada a cada chamada e um PorterStemmer novo
+por documento) com a atual (regex pré-compiladas, etapas puladas quando não se aplicam e
+stemmer reaproveitado), medindo o tempo por documento numa amostra do corpus real.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_normalization data/raw/combined_results.json --amostra 2000
+"""
+import argparse
+import json
+import re
+import timeit
+
+from nltk.stem import PorterStemmer
+
+from src.preprocessors.preprocessing import EMOJI_PATTERN, PrePreprocessor
+from benchmarks.bench_preprocessing import textos_das_postagens
+
+
+def normalizacao_antiga(text):
+    """Limpeza de texto como era feita antes (mantida aqui só como referência)."""
+    PorterStemmer()
+    text = text.encode('utf-8').decode('utf-8')
+    text = re.compile(EMOJI_PATTERN, flags=re.UNICODE).sub(r'', text)
+    text = text.replace('\n', '')
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"@\w+", "", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    return text.lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arquivo", help="Arquivo JSON com as postagens brutas (formato do load_data).")
+    parser.add_argument("--amostra", type=int, default=2000, help="Número de postagens usadas no benchmark.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.arquivo, 'r', encoding='utf-8') as f:
+        textos = textos_das_postagens(json.load(f)[:args.amostra])
+
+    preprocessor = PrePreprocessor()
+    assert [normalizacao_antiga(t) for t in textos] == [preprocessor.normalize_text(t) for t in textos]
+
+    antes = min(timeit.repeat(lambda: [normalizacao_antiga(t) for t in textos], number=1, repeat=args.repeticoes))
+    depois = min(timeit.repeat(lambda: [preprocessor.normalize_text(t) for t in textos], number=1, repeat=args.repeticoes))
+
+    print(f"Textos: {len(textos)}")
+    print(f"Antes:  {antes / len(textos) * 1e6:.1f} µs/documento")
+    print(f"Depois: {depois / len(textos) * 1e6:.1f} µs/documento")
+    print(f"Aceleração: {antes / depois:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark de inicialização: tempo de import + construção do PrePreprocessor e do Llama3,
+cada um medido num interpretador novo (como numa execução curta da CLI ou num worker reiniciado).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_startup --repeticoes 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada trecho imprime o tempo (em segundos) de import + construção
+CASOS = {
+    "PrePreprocessor": (RAIZ, (
+        "import time; t = time.perf_counter()\n"
+        "from src.preprocessors.preprocessing import PrePreprocessor\n"
+        "PrePreprocessor()\n"
+        "print(time.perf_counter() - t)"
+    )),
+    "Llama3": (RAIZ, (
+        "import time; t = time.perf_counter()\n"
+        "from src.LLaMA.llama import Llama3\n"
+        "Llama3()\n"
+        "print(time.perf_counter() - t)"
+    )),
+}
+
+
+def medir(cwd, codigo):
+    """Roda o trecho num processo Python novo e retorna o tempo medido."""
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=cwd, capture_output=True, text=True, check=True)
+    return float(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    for nome, (cwd, codigo) in CASOS.items():
+        tempos = [medir(cwd, codigo) for _ in range(args.repeticoes)]
+        print(f"{nome}: mediana {statistics.median(tempos) * 1000:.1f} ms "
+              f"(mín. {min(tempos) * 1000:.1f} ms, máx. {max(tempos) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
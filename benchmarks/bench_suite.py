@@ -0,0 +1,254 @@
+"""
+Suíte de benchmarks dos caminhos críticos com postagens sintéticas (benchmarks/synthetic.py),
+em escalas de 1k, 10k e 100k postagens:
+
+    preprocess_text       laço documento a documento (SpaCy por texto)
+    preprocess_all        processamento em lote (nlp.pipe)
+    combine_text_fields   montagem das mensagens combinadas
+    remove_empty_strings  filtragem das mensagens vazias
+    topic_extract         rótulos da LLM contra um Ollama falso com latência configurável
+
+Cada caso roda num interpretador novo (sem caches aquecidos por outros casos), e o pico de
+memória é o RSS máximo desse processo. O modelo do SpaCy é carregado antes da medição. Os
+resultados são acrescentados a um histórico JSONL e comparados com a última execução
+equivalente (mesmo caso, escala, parâmetros e máquina), para detectar regressões de vazão e memória.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_suite --escalas 1k 10k --casos preprocess_all combine_text_fields
+    python -m benchmarks.bench_suite --latencia-inicial 0.3 --concorrencia 4 --falhar-em-regressao
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic import ESCALAS, gerar_postagens
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORICO = os.path.join(RAIZ, "benchmarks", "results", "history.jsonl")
+
+CASOS = ["preprocess_text", "preprocess_all", "combine_text_fields", "remove_empty_strings", "topic_extract"]
+
+
+def pico_memoria_mb():
+    """RSS máximo do processo até agora, em MB (ru_maxrss vem em KB no Linux e em bytes no macOS)."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def com_campos_processados(postagens):
+    """Preenche os campos processed_* sem o SpaCy (só para medir combine_text_fields isoladamente)."""
+    for row in postagens:
+        if row.get('title'):
+            row['processed_title'] = row['title'].lower()
+        if row.get('text_on_media'):
+            row['processed_text_on_media'] = [text['text_on_media'].lower() for text in row['text_on_media']]
+        if row.get('hashtags'):
+            row['processed_hashtags'] = ' '.join(hashtag.lstrip('#') for hashtag in row['hashtags'])
+    return postagens
+
+
+def preparar(caso, postagens, args):
+    """
+    Prepara um caso de benchmark (fora da medição).
+
+    Returns:
+        tuple: (função medida, número de itens processados por execução).
+    """
+    from src.preprocessors.preprocessing import PrePreprocessor
+
+    preprocessor = PrePreprocessor(batch_size=args.batch_size, n_process=args.n_process)
+
+    if caso == "preprocess_text":
+        from benchmarks.bench_preprocessing import textos_das_postagens
+
+        textos = textos_das_postagens(postagens)
+        preprocessor.preprocess_text("aquecimento do modelo")  # carrega o SpaCy e o NLTK
+        return (lambda: [preprocessor.preprocess_text(texto) for texto in textos]), len(textos)
+
+    if caso == "preprocess_all":
+        preprocessor.data = postagens
+        preprocessor.preprocess_text("aquecimento do modelo")
+        return preprocessor.preprocess_all, len(postagens)
+
+    if caso == "combine_text_fields":
+        postagens = com_campos_processados(postagens)
+        return (lambda: [preprocessor.combine_text_fields(row) for row in postagens]), len(postagens)
+
+    if caso == "remove_empty_strings":
+        mensagens = [preprocessor.combine_text_fields(row) for row in com_campos_processados(postagens)]
+        return (lambda: preprocessor.remove_empty_strings(mensagens)), len(mensagens)
+
+    if caso == "topic_extract":
+        from benchmarks.fake_ollama import FakeOllama
+        from src.LLaMA.agent import topic_extract
+        from src.LLaMA.llama import Llama3
+
+        # Um tópico por postagem com texto, até --topicos (as hashtags fazem o papel das palavras-chave)
+        dados = [
+            {"palavras-chave": [hashtag.lstrip('#') for hashtag in row['hashtags']], "texto": row['title']}
+            for row in postagens if row['title']
+        ][:args.topicos]
+        # O servidor roda numa thread daemon e termina junto com o processo filho
+        servidor = FakeOllama(args.latencia_inicial, args.latencia_token).__enter__()
+        llm = Llama3(max_connections=args.concorrencia)
+        llm.base_url = servidor.url
+        llm.build_prompt("aquecimento", {"texto": "do tokenizador"})  # carrega o tokenizador
+        return (lambda: topic_extract(llm, dados, max_concorrencia=args.concorrencia)), len(dados)
+
+    raise ValueError(f"Caso desconhecido: {caso}")
+
+
+def executar(caso, escala, args):
+    """Executa um caso neste processo e retorna o resultado (chamado no processo filho)."""
+    postagens = gerar_postagens(escala, args.semente)
+    funcao, itens = preparar(caso, postagens, args)
+    memoria_inicial = pico_memoria_mb()
+
+    # Casos muito rápidos são repetidos em laço até somar --tempo-minimo (como o timeit.autorange),
+    # para que a medição não fique dominada pelo ruído
+    inicio = time.perf_counter()
+    funcao()
+    laco = max(1, math.ceil(args.tempo_minimo / max(time.perf_counter() - inicio, 1e-9)))
+
+    tempos = []
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(laco):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / laco)
+
+    melhor = min(tempos)
+    return {
+        "caso": caso,
+        "escala": escala,
+        "itens": itens,
+        "segundos": melhor,
+        "segundos_todas": tempos,
+        "laco": laco,
+        "itens_por_segundo": itens / melhor if melhor else None,
+        "memoria_inicial_mb": memoria_inicial,
+        "memoria_pico_mb": pico_memoria_mb(),
+    }
+
+
+def parametros(caso, args):
+    """Parâmetros que afetam o resultado do caso (execuções só são comparáveis se forem iguais)."""
+    valores = {"semente": args.semente, "repeticoes": args.repeticoes, "tempo_minimo": args.tempo_minimo}
+    if caso in ("preprocess_text", "preprocess_all"):
+        valores.update(batch_size=args.batch_size, n_process=args.n_process)
+    if caso == "topic_extract":
+        valores.update(topicos=args.topicos, concorrencia=args.concorrencia,
+                       latencia_inicial=args.latencia_inicial, latencia_token=args.latencia_token)
+    return valores
+
+
+def commit_atual():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True)
+    except OSError:
+        return None
+    return saida.stdout.strip() or None
+
+
+def ler_historico(caminho):
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def anterior_equivalente(historico, resultado):
+    """Última execução com o mesmo caso, escala, parâmetros e máquina."""
+    chaves = ("caso", "escala", "parametros", "maquina")
+    for registro in reversed(historico):
+        if all(registro.get(chave) == resultado[chave] for chave in chaves):
+            return registro
+    return None
+
+
+def regressoes(resultado, anterior, tolerancia):
+    """Compara vazão e pico de memória com a execução anterior; retorna as regressões encontradas."""
+    encontradas = []
+    if anterior is None:
+        return encontradas
+    if resultado["itens_por_segundo"] < anterior["itens_por_segundo"] * (1 - tolerancia):
+        encontradas.append(f"vazão {anterior['itens_por_segundo']:.1f} -> {resultado['itens_por_segundo']:.1f} itens/s")
+    if resultado["memoria_pico_mb"] > anterior["memoria_pico_mb"] * (1 + tolerancia):
+        encontradas.append(f"memória {anterior['memoria_pico_mb']:.0f} -> {resultado['memoria_pico_mb']:.0f} MB")
+    return encontradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--casos", nargs="*", choices=CASOS, default=CASOS)
+    parser.add_argument("--escalas", nargs="*", choices=list(ESCALAS), default=list(ESCALAS))
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por caso (vale a mais rápida).")
+    parser.add_argument("--tempo-minimo", type=float, default=0.2,
+                        help="Tempo mínimo de cada execução; casos mais rápidos são repetidos em laço.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--topicos", type=int, default=50, help="Tópicos enviados à LLM em topic_extract.")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Requisições simultâneas à LLM.")
+    parser.add_argument("--latencia-inicial", type=float, default=0.1, help="Segundos até o primeiro token do Ollama falso.")
+    parser.add_argument("--latencia-token", type=float, default=0.01, help="Segundos entre tokens do Ollama falso.")
+    parser.add_argument("--historico", default=HISTORICO, help="Arquivo JSONL com o histórico dos resultados.")
+    parser.add_argument("--tolerancia", type=float, default=0.1, help="Variação tolerada antes de apontar regressão.")
+    parser.add_argument("--falhar-em-regressao", action="store_true", help="Sai com código 1 se houver regressão.")
+    parser.add_argument("--executar", nargs=2, metavar=("CASO", "ESCALA"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Processo filho: executa um único caso e imprime o resultado
+    if args.executar:
+        caso, escala = args.executar
+        print(json.dumps(executar(caso, int(escala), args)))
+        return
+
+    historico = ler_historico(args.historico)
+    os.makedirs(os.path.dirname(os.path.abspath(args.historico)), exist_ok=True)
+    maquina = {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()}
+    repassados = sys.argv[1:]
+    data = datetime.datetime.now().isoformat(timespec="seconds")
+    commit = commit_atual()
+    houve_regressao = False
+
+    for nome_escala in args.escalas:
+        for caso in args.casos:
+            # topic_extract não depende do tamanho do corpus (só de --topicos): roda uma vez
+            if caso == "topic_extract" and nome_escala != args.escalas[0]:
+                continue
+
+            saida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_suite", *repassados, "--executar", caso, str(ESCALAS[nome_escala])],
+                cwd=RAIZ, capture_output=True, text=True,
+            )
+            if saida.returncode != 0:
+                print(f"{caso} ({nome_escala}): falhou\n{saida.stderr.strip().splitlines()[-1] if saida.stderr.strip() else ''}")
+                continue
+
+            resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+            resultado.update(data=data, commit=commit, parametros=parametros(caso, args), maquina=maquina)
+            encontradas = regressoes(resultado, anterior_equivalente(historico, resultado), args.tolerancia)
+            houve_regressao = houve_regressao or bool(encontradas)
+
+            print(f"{caso:<22} {nome_escala:>5}: {resultado['segundos']:8.3f}s "
+                  f"{resultado['itens_por_segundo']:12.1f} itens/s  pico {resultado['memoria_pico_mb']:7.1f} MB"
+                  + (f"  REGRESSÃO: {'; '.join(encontradas)}" if encontradas else ""))
+
+            with open(args.historico, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            historico.append(resultado)
+
+    if houve_regressao and args.falhar_em_regressao:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
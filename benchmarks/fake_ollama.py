@@ -0,0 +1,129 @@
+"""
+Servidor falso do Ollama para benchmarks: responde a /api/generate em streaming (NDJSON),
+com latência configurável até o primeiro token e entre tokens, sem precisar de GPU nem modelo.
+
+A resposta imita a do llama3: uma frase de abertura, o objeto JSON {"0": "..."} (ou um objeto
+com os índices do lote, para os prompts de PROMPT_IDENTIFICACAO_TOPICOS_LOTE) e um comentário final.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.fake_ollama --porta 11434 --latencia-inicial 0.2 --latencia-token 0.02
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def indices_do_prompt(prompt):
+    """Índices dos tópicos no JSON do final do prompt (["0"] para um prompt de tópico único)."""
+    decoder = json.JSONDecoder()
+    prompt = prompt.rstrip()
+    inicio = prompt.find("{")
+    while inicio != -1:
+        try:
+            objeto, fim = decoder.raw_decode(prompt, inicio)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if fim == len(prompt) and isinstance(objeto, dict):
+                indices = [chave for chave in objeto if chave.isdigit()]
+                return indices or ["0"]
+        inicio = prompt.find("{", inicio + 1)
+    return ["0"]
+
+
+def tokens_da_resposta(prompt):
+    """Monta os pedaços da resposta (um "token" por linha do stream)."""
+    indices = indices_do_prompt(prompt)
+    objeto = json.dumps({indice: f"Tópico sintético {indice}" for indice in indices}, ensure_ascii=False)
+    # O objeto é quebrado em pedaços pequenos, como os tokens de um modelo de verdade
+    pedacos = [objeto[i:i + 4] for i in range(0, len(objeto), 4)]
+    return ["Aqui", " está", " o", " tópico", ":\n"] + pedacos + ["\nEspero", " ter", " ajudado", "!"]
+
+
+class FakeOllama:
+    def __init__(self, latencia_inicial=0.1, latencia_token=0.01, porta=0):
+        """
+        Servidor falso do Ollama, executado numa thread em segundo plano.
+
+        Args:
+            latencia_inicial (float): Segundos até o primeiro token (processamento do prompt).
+            latencia_token (float): Segundos entre tokens consecutivos.
+            porta (int): Porta local (0 escolhe uma porta livre).
+        """
+        self.latencia_inicial = latencia_inicial
+        self.latencia_token = latencia_token
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with servidor._lock:
+                    servidor.requisicoes += 1
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                tokens = tokens_da_resposta(corpo.get("prompt", ""))
+                try:
+                    time.sleep(servidor.latencia_inicial)
+                    for token in tokens:
+                        self.enviar({"model": corpo.get("model"), "response": token, "done": False})
+                        time.sleep(servidor.latencia_token)
+                    self.enviar({"model": corpo.get("model"), "response": "", "done": True,
+                                 "prompt_eval_count": len(corpo.get("prompt", "").split()),
+                                 "eval_count": len(tokens)})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # o cliente fechou a conexão (parada antecipada)
+
+            def enviar(self, dados):
+                linha = (json.dumps(dados, ensure_ascii=False) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(linha), linha))
+                self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=11434)
+    parser.add_argument("--latencia-inicial", type=float, default=0.1, help="Segundos até o primeiro token.")
+    parser.add_argument("--latencia-token", type=float, default=0.01, help="Segundos entre tokens.")
+    args = parser.parse_args()
+
+    with FakeOllama(args.latencia_inicial, args.latencia_token, args.porta) as servidor:
+        print(f"Servidor falso do Ollama em {servidor.url} (Ctrl+C para sair)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
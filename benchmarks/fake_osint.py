@@ -0,0 +1,217 @@
+"""
+Servidor falso da API do osint.rest para verificar o coletor (data/collect-data.py) sem rede nem
+chave de API: responde a /api/instagram/user_photos com {"result": [...]} em streaming (chunked),
+em blocos pequenos que cortam postagens, números e caracteres UTF-8 no meio.
+
+Com --verificar, roda o coletor duas vezes contra o servidor e confere que:
+    - as postagens do envelope {"result": [...]} chegam inteiras e na ordem;
+    - a segunda execução retoma pelo checkpoint, sem pedir de novo os perfis já concluídos;
+    - um perfil que recebeu 500 fica fora do checkpoint e é coletado na execução seguinte.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.fake_osint --verificar
+    python -m benchmarks.fake_osint --porta 8000 --postagens 500
+    OSINT_API_URL=http://127.0.0.1:8000/api/instagram/user_photos python data/collect-data.py
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import gerar_postagens
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def postagens_do_perfil(perfil, n):
+    """Postagens sintéticas determinísticas de um perfil (a mesma entrada gera as mesmas postagens)."""
+    postagens = gerar_postagens(n, semente=sum(perfil.encode("utf-8")))
+    for i, postagem in enumerate(postagens):
+        postagem.update(id=f"{perfil}_{i}", likes=i * 1234)
+    return postagens
+
+
+class FakeOsint:
+    def __init__(self, postagens=50, falhas=None, tamanho_bloco=7, latencia_bloco=0.0, porta=0):
+        """
+        Servidor falso da API do osint.rest, executado numa thread em segundo plano.
+
+        Args:
+            postagens (int | dict): Postagens por perfil (ou um dict perfil -> número de postagens).
+            falhas (dict): Perfil -> número de requisições iniciais respondidas com 500.
+            tamanho_bloco (int): Bytes por bloco do corpo (blocos pequenos cortam as postagens no meio).
+            latencia_bloco (float): Segundos entre blocos consecutivos.
+            porta (int): Porta local (0 escolhe uma porta livre).
+        """
+        self.postagens = postagens
+        self.falhas = dict(falhas or {})
+        self.tamanho_bloco = tamanho_bloco
+        self.latencia_bloco = latencia_bloco
+        self.requisicoes = {}
+        self._lock = threading.Lock()
+
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    pass  # o coletor fecha a conexão ao chegar no ']' final, sem ler o resto do corpo
+
+            def do_GET(self):
+                perfil = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+                with servidor._lock:
+                    servidor.requisicoes[perfil] = servidor.requisicoes.get(perfil, 0) + 1
+                    falhar = servidor.falhas.get(perfil, 0) > 0
+                    if falhar:
+                        servidor.falhas[perfil] -= 1
+
+                if falhar:
+                    corpo = b'{"error": "Internal Server Error"}'
+                    self.send_response(500)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(corpo)))
+                    self.end_headers()
+                    self.wfile.write(corpo)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                corpo = json.dumps({"status": "ok", "result": servidor.postagens_de(perfil)},
+                                   ensure_ascii=False).encode("utf-8")
+                try:
+                    for i in range(0, len(corpo), servidor.tamanho_bloco):
+                        bloco = corpo[i:i + servidor.tamanho_bloco]
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(bloco), bloco))
+                        self.wfile.flush()
+                        time.sleep(servidor.latencia_bloco)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # o cliente fechou a conexão
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+        self.httpd.daemon_threads = True
+
+    def postagens_de(self, perfil):
+        n = self.postagens.get(perfil, 0) if isinstance(self.postagens, dict) else self.postagens
+        return postagens_do_perfil(perfil, n)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}/api/instagram/user_photos"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
+
+
+def carregar_coletor():
+    """Importa data/collect-data.py (o nome com hífen impede o import direto)."""
+    spec = importlib.util.spec_from_file_location("collect_data", os.path.join(RAIZ, "data", "collect-data.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def ler_jsonl(caminho):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f]
+
+
+def verificar_coleta():
+    """
+    Roda o coletor duas vezes contra o servidor falso e confere o streaming e a retomada.
+
+    Returns:
+        list: Problemas encontrados (vazia se tudo estiver certo).
+    """
+    coletor = carregar_coletor()
+    postagens = {"coletivo_feminista": 40, "revistatpm": 3, "planetaella": 0, "arquivosfeministas": 25}
+    perfis = list(postagens)
+    problemas = []
+
+    def conferir(condicao, mensagem):
+        if not condicao:
+            problemas.append(mensagem)
+
+    with tempfile.TemporaryDirectory() as saida, FakeOsint(postagens, falhas={"arquivosfeministas": 1}) as servidor:
+        coletor.API_URL = servidor.url
+
+        # Primeira execução: o perfil com 500 falha, os demais são coletados
+        resultados = coletor.collect(perfis, saida, max_workers=2)
+        conferir("error" in resultados["arquivosfeministas"], "o perfil com 500 deveria ter falhado")
+        conferir(not os.path.exists(os.path.join(saida, "arquivosfeministas.jsonl")),
+                 "o perfil com 500 não deveria deixar arquivo")
+        for perfil in perfis[:3]:
+            caminho = os.path.join(saida, f"{perfil}.jsonl")
+            conferir(resultados[perfil].get("posts") == postagens[perfil],
+                     f"{perfil}: {resultados[perfil]} (esperadas {postagens[perfil]} postagens)")
+            conferir(os.path.exists(caminho) and ler_jsonl(caminho) == postagens_do_perfil(perfil, postagens[perfil]),
+                     f"{perfil}: postagens gravadas diferentes das enviadas")
+
+        # Segunda execução: os perfis concluídos vêm do checkpoint, o que falhou é coletado de novo
+        requisicoes = dict(servidor.requisicoes)
+        resultados = coletor.collect(perfis, saida, max_workers=2)
+        for perfil in perfis[:3]:
+            conferir(servidor.requisicoes[perfil] == requisicoes[perfil],
+                     f"{perfil}: pedido de novo apesar de estar no checkpoint")
+            conferir(resultados[perfil].get("posts") == postagens[perfil], f"{perfil}: {resultados[perfil]} na retomada")
+        conferir(servidor.requisicoes["arquivosfeministas"] == 2, "o perfil com 500 deveria ser pedido de novo")
+        conferir(resultados["arquivosfeministas"].get("posts") == postagens["arquivosfeministas"],
+                 f"arquivosfeministas: {resultados['arquivosfeministas']} depois da nova tentativa")
+        caminho = os.path.join(saida, "arquivosfeministas.jsonl")
+        conferir(os.path.exists(caminho)
+                 and ler_jsonl(caminho) == postagens_do_perfil("arquivosfeministas", postagens["arquivosfeministas"]),
+                 "arquivosfeministas: postagens gravadas diferentes das enviadas")
+        conferir(not any(nome.endswith(".part") for nome in os.listdir(saida)), "sobraram arquivos .part")
+
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verificar", action="store_true", help="Verifica o coletor contra o servidor falso e sai.")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--postagens", type=int, default=50, help="Postagens por perfil.")
+    parser.add_argument("--tamanho-bloco", type=int, default=7, help="Bytes por bloco do corpo da resposta.")
+    parser.add_argument("--latencia-bloco", type=float, default=0.0, help="Segundos entre blocos.")
+    args = parser.parse_args()
+
+    if args.verificar:
+        problemas = verificar_coleta()
+        for problema in problemas:
+            print(f"FALHOU: {problema}")
+        print("Coletor OK" if not problemas else f"{len(problemas)} problema(s) no coletor")
+        sys.exit(1 if problemas else 0)
+
+    with FakeOsint(args.postagens, tamanho_bloco=args.tamanho_bloco,
+                   latencia_bloco=args.latencia_bloco, porta=args.porta) as servidor:
+        print(f"Servidor falso do osint.rest em {servidor.url} (Ctrl+C para sair)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Gerador de postagens sintéticas no formato do load_data (title, text_on_media, hashtags),
+imitando o corpus do Instagram: português com acentos, emojis, menções, URLs, quebras de
+linha, hashtags, postagens sem texto e repostagens.
+
+A geração é determinística (mesma semente -> mesmas postagens), para que os benchmarks
+sejam comparáveis entre execuções.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.synthetic 10000 data/raw/sintetico_10k.json --semente 42
+"""
+import argparse
+import json
+import random
+
+PALAVRAS = (
+    "mulher mulheres feminismo feminista direitos igualdade gênero violência doméstica aborto "
+    "legal saúde corpo trabalho salário maternidade creche luta coletivo sororidade machismo "
+    "assédio respeito liberdade escolha política representatividade voto história conquista "
+    "ditadura resistência periferia negra racismo interseccionalidade educação escola "
+    "universidade ciência pesquisa dados brasil país lei projeto câmara senado justiça "
+    "denúncia acolhimento rede apoio campanha março dia internacional vida dignidade "
+    "autonomia cuidado família mãe filha amiga companheira você nós elas hoje sempre nunca "
+    "não é são foi será precisamos queremos lutamos juntas todas cada mais menos muito"
+).split()
+
+CONECTIVOS = "de da do das dos em na no com para por que e a o as os uma um sobre contra entre".split()
+
+EMOJIS = ["💜", "✊", "🔥", "👏", "😡", "😢", "🌸", "📢", "➡️", "✨", "🙌🏽", "❤️"]
+
+HASHTAGS = [
+    "#feminismo", "#feminista", "#mulheres", "#8M", "#direitosdasmulheres", "#igualdadedegenero",
+    "#sororidade", "#leimariadapenha", "#abortolegal", "#violenciacontraamulher", "#empoderamento",
+    "#mulheresnapolitica", "#feminismonegro", "#maternidadereal", "#elasnao",
+]
+
+PERFIS = ["@coletivofeminista", "@revistatpm", "@planetaella", "@arquivosfeministas", "@onumulheres"]
+
+ESCALAS = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+
+def frase(rng, min_palavras, max_palavras):
+    """Gera uma frase com palavras do vocabulário, conectivos e pontuação."""
+    palavras = []
+    for _ in range(rng.randint(min_palavras, max_palavras)):
+        palavras.append(rng.choice(CONECTIVOS) if rng.random() < 0.3 else rng.choice(PALAVRAS))
+    texto = " ".join(palavras).capitalize()
+    return texto + rng.choice([".", "!", "?", "...", "!!", ":"])
+
+
+def texto_de_postagem(rng, min_frases, max_frases):
+    """Gera um texto de postagem com o ruído típico do Instagram."""
+    partes = []
+    for _ in range(rng.randint(min_frases, max_frases)):
+        parte = frase(rng, 4, 18)
+        if rng.random() < 0.35:
+            parte += " " + "".join(rng.choices(EMOJIS, k=rng.randint(1, 3)))
+        if rng.random() < 0.15:
+            parte += " " + rng.choice(PERFIS)
+        if rng.random() < 0.2:
+            parte += " " + rng.choice(HASHTAGS)
+        partes.append(parte)
+    if rng.random() < 0.1:
+        partes.append(f"Saiba mais em https://exemplo.org.br/{rng.randint(1, 99999)}")
+    return rng.choice([" ", "\n", "\n\n"]).join(partes)
+
+
+def gerar_postagens(n, semente=42, taxa_vazias=0.03, taxa_repostagens=0.05):
+    """
+    Gera `n` postagens sintéticas no formato do load_data.
+
+    Args:
+        n (int): Número de postagens.
+        semente (int): Semente do gerador (a mesma semente gera as mesmas postagens).
+        taxa_vazias (float): Fração de postagens sem título, texto de mídia nem hashtags.
+        taxa_repostagens (float): Fração de postagens que repetem o título de uma anterior.
+
+    Returns:
+        list: Lista de postagens (dicts com title, text_on_media e hashtags).
+    """
+    rng = random.Random(semente)
+    postagens = []
+    for _ in range(n):
+        sorteio = rng.random()
+        if sorteio < taxa_vazias:
+            postagens.append({"title": "", "text_on_media": [], "hashtags": []})
+            continue
+
+        if postagens and sorteio < taxa_vazias + taxa_repostagens:
+            titulo = rng.choice(postagens)["title"]
+        else:
+            titulo = texto_de_postagem(rng, 1, 6)
+
+        text_on_media = [{"text_on_media": texto_de_postagem(rng, 1, 2)}
+                         for _ in range(rng.choices([0, 1, 2, 3], weights=[5, 3, 1, 1])[0])]
+        hashtags = rng.sample(HASHTAGS, rng.randint(0, 6))
+        postagens.append({"title": titulo, "text_on_media": text_on_media, "hashtags": hashtags})
+    return postagens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("n", type=int, help="Número de postagens.")
+    parser.add_argument("saida", help="Arquivo de saída (.json ou .jsonl).")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    postagens = gerar_postagens(args.n, args.semente)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        if args.saida.endswith('.jsonl'):
+            for postagem in postagens:
+                f.write(json.dumps(postagem, ensure_ascii=False) + '\n')
+        else:
+            json.dump(postagens, f, ensure_ascii=False, indent=4)
+    print(f"{len(postagens)} postagens salvas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import requests
+from requests.adapters import HTTPAdapter
+import argparse
+import codecs
 import json
+import re
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 
@@ -11,50 +17,222 @@ load_dotenv()
 # Configuração do logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Caminho de saída para o arquivo
-output_path = "/home/thalia/TCC/data/raw/2024_09_26_arquivosfeministas.json"
-
-# URL da API
-url = "https://osint.rest/api/instagram/user_photos?query=arquivosfeministas&limit=10000&timeout=1000"
-
-# Payload e cabeçalhos
-payload = {}
-headers = {
-    'Authorization': f'{os.getenv("API_KEY")}'  
-}
-# Início da contagem do tempo
-start_time = time.time()
-logging.info("Iniciando a requisição para a URL: %s", url)
-try:
-    # Fazendo a requisição
-    response = requests.get(url, headers=headers, data=payload)
-    
-    # Verificando o status da resposta
-    response.raise_for_status()  # Levanta um erro para códigos de status 4xx/5xx
-
-    # Processando os dados
-    dados = response.json()
-    
-    # Logando a resposta
-    logging.info("Requisição bem-sucedida. Status Code: %d", response.status_code)
-    logging.info("Dados recebidos: %s", json.dumps(dados, indent=4)[:500])  # Exibir apenas os primeiros 500 caracteres
-
-except requests.exceptions.HTTPError as http_err:
-    logging.error("Erro HTTP: %s", http_err)
-except requests.exceptions.ConnectionError:
-    logging.error("Erro de conexão. Verifique a URL ou sua conexão de internet.")
-except requests.exceptions.Timeout:
-    logging.error("A requisição excedeu o tempo limite.")
-except requests.exceptions.RequestException as err:
-    logging.error("Ocorreu um erro: %s", err)
-except json.JSONDecodeError:
-    logging.error("Erro ao decodificar a resposta JSON.")
-else:
-    # Salvando os dados no arquivo
-    with open(output_path, 'w') as f:
-        json.dump(dados, f, indent=4)
-    logging.info("Dados salvos em: %s", output_path)
-
-# Fim da contagem do tempo
-end_time = time.time()
-logging.info("Tempo total da requisição: %.2f segundos", end_time - start_time)
+# URL da API (pode ser trocada por um servidor local para testes)
+API_URL = os.getenv("OSINT_API_URL") or "https://osint.rest/api/instagram/user_photos"
+
+# Diretório de saída: um arquivo JSONL por perfil, mais o checkpoint da coleta
+OUTPUT_DIR = "/home/thalia/TCC/data/raw"
+
+# Perfis coletados (os mesmos das bases usadas em main.py)
+PROFILES = [
+    "coletivo_feminista",
+    "feminiismo",
+    "feminismo_semdemagogia",
+    "planetaella",
+    "arquivosfeministas",
+    "revistatpm",
+]
+
+# Início do array de postagens na resposta da API ({"result": [...]})
+RESULT_ARRAY = re.compile(r'"result"\s*:\s*\[')
+
+
+def make_session(max_connections=10):
+    """Cria uma sessão HTTP com pool de conexões, compartilhada entre as threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers['Authorization'] = f'{os.getenv("API_KEY")}'
+    return session
+
+
+def iter_posts(chunks):
+    """
+    Decodifica as postagens à medida que os blocos da resposta chegam, sem esperar o corpo inteiro.
+
+    Aceita tanto uma lista de postagens quanto um objeto com a lista no campo "result".
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+
+        # Procura o início do array de postagens
+        if not started:
+            stripped = buffer.lstrip()
+            if stripped.startswith('['):
+                buffer = stripped[1:]
+                started = True
+            else:
+                match = RESULT_ARRAY.search(buffer)
+                if match is None:
+                    continue
+                buffer = buffer[match.end():]
+                started = True
+
+        # Extrai todas as postagens completas que já estão no buffer
+        while True:
+            buffer = buffer.lstrip()
+            if buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+            if buffer.startswith(']'):
+                return
+            if not buffer:
+                break
+            try:
+                post, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # Postagem incompleta: espera o próximo bloco
+            # Um valor cortado no fim do bloco pode decodificar como um valor menor ("23" de "234"):
+            # a postagem só está completa quando vem seguida de ',' ou ']'
+            if buffer[end:].lstrip()[:1] not in (',', ']'):
+                break
+            yield post
+            buffer = buffer[end:]
+
+    if not started:
+        raise ValueError(f"Resposta sem lista de postagens: {buffer[:500]}")
+    raise ValueError("Resposta JSON incompleta: ']' de fechamento não encontrado.")
+
+
+def count_lines(path, chunk_size=1 << 20):
+    """Conta as linhas de um arquivo JSONL (uma postagem por linha) sem decodificá-lo."""
+    total = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            total += chunk.count(b'\n')
+    return total
+
+
+class Checkpoint:
+    def __init__(self, path):
+        """Registro dos perfis já coletados, salvo em disco a cada perfil concluído."""
+        self.path = path
+        self.__lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def is_done(self, profile):
+        """
+        Um perfil só conta como coletado se o arquivo registrado ainda existir com o mesmo número
+        de postagens (um arquivo apagado ou alterado depois da coleta faz o perfil ser coletado de novo).
+        """
+        entry = self.data.get(profile, {})
+        if entry.get("status") != "done":
+            return False
+        path = entry.get("path")
+        if not path or not os.path.exists(path):
+            return False
+        return count_lines(path) == entry.get("posts")
+
+    def mark_done(self, profile, output_path, posts):
+        with self.__lock:
+            self.data[profile] = {"status": "done", "path": output_path, "posts": posts, "finished_at": time.time()}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+
+
+def fetch_profile(session, profile, output_dir, limit=10000, timeout=1000):
+    """
+    Coleta as postagens de um perfil, gravando cada postagem em JSONL assim que ela chega.
+
+    O arquivo é escrito como `.part` e só é renomeado ao final, então uma coleta interrompida
+    nunca deixa um arquivo incompleto com cara de concluído.
+
+    Returns:
+        tuple: (caminho do arquivo JSONL, número de postagens).
+    """
+    output_path = os.path.join(output_dir, f"{profile}.jsonl")
+    tmp_path = output_path + ".part"
+    params = {"query": profile, "limit": limit, "timeout": timeout}
+
+    start_time = time.time()
+    logging.info("Iniciando a coleta do perfil %s", profile)
+
+    total = 0
+    with session.get(API_URL, params=params, stream=True) as response:
+        # Verificando o status da resposta
+        response.raise_for_status()  # Levanta um erro para códigos de status 4xx/5xx
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for post in iter_posts(response.iter_content(chunk_size=65536)):
+                f.write(json.dumps(post, ensure_ascii=False) + '\n')
+                total += 1
+
+    os.replace(tmp_path, output_path)
+    logging.info("Perfil %s: %d postagens salvas em %s (%.2f segundos)",
+                 profile, total, output_path, time.time() - start_time)
+    return output_path, total
+
+
+def collect(profiles, output_dir=OUTPUT_DIR, max_workers=4, limit=10000, timeout=1000):
+    """
+    Coleta vários perfis em paralelo, retomando de onde a última execução parou.
+
+    Returns:
+        dict: Resultado por perfil (caminho, número de postagens e tempo da coleta, ou o erro).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.json"))
+    session = make_session(max_connections=max_workers)
+
+    pending = [profile for profile in profiles if not checkpoint.is_done(profile)]
+    for profile in profiles:
+        if profile not in pending:
+            logging.info("Perfil %s já coletado; pulando.", profile)
+
+    def run(profile):
+        start = time.perf_counter()
+        try:
+            output_path, total = fetch_profile(session, profile, output_dir, limit, timeout)
+        except requests.exceptions.HTTPError as http_err:
+            logging.error("Perfil %s - Erro HTTP: %s", profile, http_err)
+            return {"error": str(http_err)}
+        except requests.exceptions.ConnectionError:
+            logging.error("Perfil %s - Erro de conexão. Verifique a URL ou sua conexão de internet.", profile)
+            return {"error": "connection"}
+        except requests.exceptions.Timeout:
+            logging.error("Perfil %s - A requisição excedeu o tempo limite.", profile)
+            return {"error": "timeout"}
+        except requests.exceptions.RequestException as err:
+            logging.error("Perfil %s - Ocorreu um erro: %s", profile, err)
+            return {"error": str(err)}
+        except ValueError as err:
+            logging.error("Perfil %s - Erro ao decodificar a resposta JSON: %s", profile, err)
+            return {"error": str(err)}
+        checkpoint.mark_done(profile, output_path, total)
+        elapsed = time.perf_counter() - start
+        logging.info("Perfil %s: %d postagens em %.2f segundos.", profile, total, elapsed)
+        return {"path": output_path, "posts": total, "seconds": elapsed}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(pending, executor.map(run, pending)))
+
+    for profile in profiles:
+        if profile not in results:
+            results[profile] = {"path": checkpoint.data[profile]["path"], "posts": checkpoint.data[profile]["posts"]}
+    return {profile: results[profile] for profile in profiles}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta as postagens de perfis do Instagram.")
+    parser.add_argument("profiles", nargs="*", default=PROFILES, help="Perfis a coletar.")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=4, help="Número máximo de perfis coletados ao mesmo tempo.")
+    parser.add_argument("--limit", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Início da contagem do tempo
+    start_time = time.time()
+    collect(args.profiles, args.output_dir, max_workers=args.workers, limit=args.limit)
+
+    # Fim da contagem do tempo
+    logging.info("Tempo total da coleta: %.2f segundos", time.time() - start_time)
@@ -1,35 +1,45 @@
-from src.preprocessors.preprocessing import PrePreprocessor
+import argparse
+import logging
+import os
 
-import json 
-def main():
-    # lista_bases = ['/home/thalia/TCC/data/raw/2024_09_22_coletivo_feminista.json', 
-    #                '/home/thalia/TCC/data/raw/2024_09_22_feminiismo.json', 
-    #                '/home/thalia/TCC/data/raw/2024_09_22_feminismo_semdemagogia.json', 
-    #                '/home/thalia/TCC/data/raw/2024_09_22_planetaella.json',
-    #                '/home/thalia/TCC/data/raw/2024_09_26_arquivosfeministas.json',
-    #                '/home/thalia/TCC/data/raw/2024_09_26_revistatpm.json' ]
-    # Instancia o pré-processador
-    preprocessor = PrePreprocessor()
-    
-    # # Carrega os dados do arquivo JSON
-    preprocessor.load_data(f'/home/thalia/TCC/data/raw/combined_results.json')
-    
-    # # Processa todos os textos e hashtags
-    processed_texts = preprocessor.preprocess_all()
-    
-    # # # Salva o resultado no formato JSON (um array de mensagens combinadas)
-    # preprocessor.save_processed_data(f'/home/thalia/TCC/data/processed/profiles_data_3.json', processed_texts)
-
-    # preprocessor.combine_json_files(lista_bases, '/home/thalia/TCC/data/processed/profiles_data.json')
+from src.metrics import Metrics, profiled
+from src.pipeline import Pipeline, STAGES
 
-    with open('/home/thalia/TCC/data/processed/profiles_data_3.json', 'r', encoding='utf-8') as f:
-            text_list = json.load(f)
+# Configuração do logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    processed_list = preprocessor.remove_empty_strings(text_list)
-
-    # print( len(text_list), len(processed_list),) #antes: 11582 depois:11070 
-    preprocessor.save_processed_data(f'/home/thalia/TCC/data/processed/profiles_data_3.json', processed_list)
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pipeline completo: coleta -> combinação -> pré-processamento -> filtragem -> tópicos -> rótulos da LLM. "
+                    "Etapas cujas entradas e configuração não mudaram desde a última execução são puladas."
+    )
+    parser.add_argument("--work-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "pipeline"),
+                        help="Diretório dos arquivos intermediários.")
+    parser.add_argument("--until", choices=STAGES, default=STAGES[-1], help="Última etapa a executar.")
+    parser.add_argument("--force", nargs="*", choices=STAGES, default=[], help="Etapas a recalcular mesmo se atualizadas.")
+    parser.add_argument("--refit-topics", action="store_true",
+                        help="Refaz o ajuste completo do BERTopic em vez de só atribuir tópicos aos documentos novos.")
+    parser.add_argument("--raw", nargs="*", help="Arquivos brutos já coletados (.json ou .jsonl); pula a coleta.")
+    parser.add_argument("--profiles", nargs="*", help="Perfis a coletar (padrão: os de data/collect-data.py).")
+    parser.add_argument("--collect-workers", type=int, default=4)
+    parser.add_argument("--n-process", type=int, default=1, help="Processos do SpaCy no pré-processamento.")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Requisições simultâneas à LLM.")
+    parser.add_argument("--metrics", help="Salva as métricas de desempenho neste arquivo (.json ou .prom).")
+    parser.add_argument("--profile", help="Executa sob o cProfile e salva as estatísticas neste arquivo.")
+    args = parser.parse_args()
+
+    config = {
+        "collect": {"profiles": args.profiles, "workers": args.collect_workers},
+        "preprocess": {"n_process": args.n_process},
+        "label": {"concurrency": args.llm_concurrency},
+    }
+    metrics = Metrics() if args.metrics else None
+    with profiled(args.profile):
+        Pipeline(args.work_dir, config, force=args.force, metrics=metrics,
+                 refit_topics=args.refit_topics).run(until=args.until, raw_files=args.raw)
+    if metrics is not None:
+        metrics.save(args.metrics)
 
 
 if __name__ == "__main__":
@@ -1,63 +1,246 @@
-from llama import Llama3
-from prompts import PROMPT_IDENTIFICACAO_TOPICO
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
+import sys
 
-def topic_extract(llm, dados, max_tentativas=3):
+if __package__:
+    from .llama import Llama3
+    from .prompts import PROMPT_IDENTIFICACAO_TOPICO, PROMPT_IDENTIFICACAO_TOPICOS_LOTE
+else:
+    # Executado como script (python agent.py ou python src/LLaMA/agent.py): sem pacote, os imports
+    # relativos falham, então a raiz do repositório vai para o sys.path e os imports são absolutos
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from src.LLaMA.llama import Llama3
+    from src.LLaMA.prompts import PROMPT_IDENTIFICACAO_TOPICO, PROMPT_IDENTIFICACAO_TOPICOS_LOTE
+
+# Diretório deste módulo: os arquivos de entrada e saída são resolvidos a partir dele,
+# independentemente do diretório de onde o script é chamado
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def resposta_aceita(resposta, indices=None):
+    """
+    Verifica se a resposta da LLM é um objeto JSON com os tópicos pedidos.
+
+    Args:
+        resposta (str): Resposta da LLM.
+        indices (list): Índices que devem estar na resposta, cada um com um nome de tópico
+            (sem eles, basta um objeto não vazio, como em label_topic).
+
+    Returns:
+        bool: True se a resposta pode ser usada (e guardada no cache).
+    """
+    try:
+        resposta_json = json.loads(resposta)
+    except json.JSONDecodeError:
+        return False
+    if not isinstance(resposta_json, dict) or not resposta_json:
+        return False
+    if indices is None:
+        return True
+    return all(
+        isinstance(resposta_json.get(str(i)), str) and resposta_json[str(i)].strip() for i in indices
+    )
+
+def label_topic(llm, i, item, max_tentativas=3):
+    """
+    Envia um único tópico para a LLM, com tentativas adicionais em caso de erro.
+
+    Args:
+        llm: Instância da classe Llama3 para enviar os prompts.
+        i (int): Índice do tópico na lista de dados original.
+        item (dict): Tópico (palavras-chave e texto) a ser processado.
+        max_tentativas (int): Número máximo de tentativas em caso de erro.
+
+    Returns:
+        str: Nome do tópico identificado pela LLM, ou a mensagem de erro.
     """
-    Processa os tópicos individualmente e coleta as respostas da LLM, com tentativas adicionais em caso de erro.
+    # Preparando o prompt para o tópico atual (já dentro do limite de tokens do modelo)
+    prompt = llm.build_prompt(PROMPT_IDENTIFICACAO_TOPICO, item)
+
+    for tentativas in range(1, max_tentativas + 1):
+        if tentativas > 1:
+            llm.metrics.incr("llm_retries")
+
+        # Enviando o prompt para a LLM
+        resposta = llm.send_prompt(prompt, truncate=False, accept=resposta_aceita)
+
+        # Processando a resposta e tentando converter para dicionário
+        try:
+            resposta_json = json.loads(resposta)
+        except json.JSONDecodeError:
+            print(f"Erro ao decodificar a resposta da LLM para o tópico {i}, tentativa {tentativas} de {max_tentativas}")
+            continue
+
+        # Um JSON válido que não é um objeto (lista, string...) conta como tentativa falha
+        if not isinstance(resposta_json, dict):
+            print(f"Resposta da LLM fora do formato esperado para o tópico {i}, tentativa {tentativas} de {max_tentativas}")
+            continue
+
+        # O índice devolvido pela LLM é ignorado: o tópico é associado ao índice real na lista
+        topicos = list(resposta_json.values())
+        if topicos:
+            return topicos[-1]  # Se o JSON é válido, marcamos como sucesso
+
+    print(f"Falha ao processar o tópico {i} após {max_tentativas} tentativas.")
+    llm.metrics.incr("llm_failed_topics")
+    return "Erro: Tópico não identificado"
+
+def topic_extract(llm, dados, max_tentativas=3, max_concorrencia=1):
+    """
+    Processa os tópicos e coleta as respostas da LLM, com tentativas adicionais em caso de erro.
 
     Args:
         llm: Instância da classe Llama3 para enviar os prompts.
         dados (list): Lista de tópicos (palavras-chave e textos) a serem processados.
         max_tentativas (int): Número máximo de tentativas para cada tópico em caso de erro.
+        max_concorrencia (int): Número máximo de requisições simultâneas à LLM (1 = sequencial).
 
     Returns:
         dict: JSON com todas as respostas coletadas para os tópicos.
     """
-    resultados = {}
+    with llm.metrics.stage("topic_extract") as etapa:
+        etapa.add(len(dados))
+        if max_concorrencia <= 1:
+            # Processando cada tópico individualmente
+            return {i: label_topic(llm, i, item, max_tentativas) for i, item in enumerate(dados)}
+
+        # Processando os tópicos em paralelo, com no máximo `max_concorrencia` requisições em andamento
+        with ThreadPoolExecutor(max_workers=max_concorrencia) as executor:
+            futuros = [
+                executor.submit(label_topic, llm, i, item, max_tentativas) for i, item in enumerate(dados)
+            ]
+            # O dicionário é montado na ordem dos índices, igual ao modo sequencial
+            return {i: futuro.result() for i, futuro in enumerate(futuros)}
+
+def pack_topics(llm, dados, indices, max_topicos_por_lote=20):
+    """
+    Agrupa os tópicos em lotes que cabem no limite de tokens da LLM.
+
+    Args:
+        llm: Instância da classe Llama3 (usada para contar tokens).
+        dados (list): Lista de tópicos original.
+        indices (list): Índices dos tópicos a agrupar.
+        max_topicos_por_lote (int): Número máximo de tópicos por lote.
+
+    Returns:
+        tuple: (lotes, avulsos) — lista de lotes de índices e lista de índices que não cabem sozinhos num lote.
+    """
+    budget = llm.max_tokens - llm.preamble_tokens(PROMPT_IDENTIFICACAO_TOPICOS_LOTE)
+
+    # Cada entrada é contada com a própria chave e chaves do objeto, o que superestima um pouco o total
+    custos = llm.count_tokens([json.dumps({str(i): dados[i]}, ensure_ascii=False) for i in indices])
+
+    lotes, avulsos = [], []
+    lote, usado = [], 0
+    for i, custo in zip(indices, custos):
+        if custo > budget:
+            avulsos.append(i)
+            continue
+        if lote and (usado + custo > budget or len(lote) >= max_topicos_por_lote):
+            lotes.append(lote)
+            lote, usado = [], 0
+        lote.append(i)
+        usado += custo
+    if lote:
+        lotes.append(lote)
+    return lotes, avulsos
 
-    # Processando cada tópico individualmente
-    for i, item in enumerate(dados):
-        tentativas = 0
-        sucesso = False
-
-        while tentativas < max_tentativas and not sucesso:
-            # Preparando o prompt para o tópico atual
-            prompt = PROMPT_IDENTIFICACAO_TOPICO + json.dumps(item)
-
-            # Enviando o prompt para a LLM
-            resposta = llm.send_prompt(prompt)
-
-            # Processando a resposta e tentando converter para dicionário
-            try:
-                resposta_json = json.loads(resposta)
-                for indice, topico in resposta_json.items():
-                    # Ajustando o índice para o índice real na lista de dados original
-                    resultados[i] = topico
-                sucesso = True  # Se o JSON é válido, marcamos como sucesso
-            except json.JSONDecodeError:
-                tentativas += 1
-                print(f"Erro ao decodificar a resposta da LLM para o tópico {i}, tentativa {tentativas} de {max_tentativas}")
-                
-            if not sucesso and tentativas >= max_tentativas:
-                print(f"Falha ao processar o tópico {i} após {max_tentativas} tentativas.")
-                resultados[i] = "Erro: Tópico não identificado"
+def label_topic_batch(llm, dados, lote):
+    """
+    Envia vários tópicos num único prompt e associa os índices retornados aos tópicos.
+
+    Args:
+        llm: Instância da classe Llama3 para enviar os prompts.
+        dados (list): Lista de tópicos original.
+        lote (list): Índices dos tópicos enviados neste prompt.
 
+    Returns:
+        dict: Tópicos identificados, por índice (apenas os índices do lote presentes na resposta).
+    """
+    prompt = PROMPT_IDENTIFICACAO_TOPICOS_LOTE + json.dumps({str(i): dados[i] for i in lote}, ensure_ascii=False)
+    # Só a resposta com todos os índices do lote vai para o cache; uma resposta parcial seria
+    # devolvida do cache de novo na próxima execução, deixando os tópicos que faltaram sem resposta
+    resposta = llm.send_prompt(prompt, truncate=False, accept=lambda texto: resposta_aceita(texto, lote))
+
+    try:
+        resposta_json = json.loads(resposta)
+    except json.JSONDecodeError:
+        print(f"Erro ao decodificar a resposta da LLM para o lote {lote}")
+        return {}
+    if not isinstance(resposta_json, dict):
+        return {}
+
+    resultados = {}
+    for i in lote:
+        topico = resposta_json.get(str(i))
+        if isinstance(topico, str) and topico.strip():
+            resultados[i] = topico
     return resultados
 
+def topic_extract_batch(llm, dados, max_tentativas=3, max_concorrencia=1, max_topicos_por_lote=20):
+    """
+    Processa os tópicos em lotes (vários tópicos por prompt), reduzindo o número de chamadas à LLM.
+
+    Os tópicos que ficarem de fora de uma resposta parcial são reenviados em novos lotes,
+    até `max_tentativas` rodadas. Tópicos grandes demais para um lote são processados individualmente.
+
+    Args:
+        llm: Instância da classe Llama3 para enviar os prompts.
+        dados (list): Lista de tópicos (palavras-chave e textos) a serem processados.
+        max_tentativas (int): Número máximo de rodadas para cada tópico em caso de erro.
+        max_concorrencia (int): Número máximo de requisições simultâneas à LLM (1 = sequencial).
+        max_topicos_por_lote (int): Número máximo de tópicos por prompt.
+
+    Returns:
+        dict: JSON com todas as respostas coletadas para os tópicos, no mesmo formato de topic_extract.
+    """
+    resultados = {}
+    pendentes = list(range(len(dados)))
+    avulsos = []
+
+    with llm.metrics.stage("topic_extract") as etapa, \
+            ThreadPoolExecutor(max_workers=max(1, max_concorrencia)) as executor:
+        etapa.add(len(dados))
+        for tentativa in range(1, max_tentativas + 1):
+            if not pendentes:
+                break
+            if tentativa > 1:
+                llm.metrics.incr("llm_retries", len(pendentes))
+            lotes, grandes = pack_topics(llm, dados, pendentes, max_topicos_por_lote)
+            avulsos.extend(grandes)
+
+            for parcial in executor.map(lambda lote: label_topic_batch(llm, dados, lote), lotes):
+                resultados.update(parcial)
+
+            pendentes = [i for lote in lotes for i in lote if i not in resultados]
+            if pendentes:
+                print(f"{len(pendentes)} tópicos sem resposta na rodada {tentativa} de {max_tentativas}")
+
+        # Tópicos que não cabem num lote passam pelo fluxo individual (que encurta o texto)
+        for i, topico in zip(avulsos, executor.map(lambda i: label_topic(llm, i, dados[i], max_tentativas), avulsos)):
+            resultados[i] = topico
+
+    for i in pendentes:
+        print(f"Falha ao processar o tópico {i} após {max_tentativas} tentativas.")
+        resultados[i] = "Erro: Tópico não identificado"
+    llm.metrics.incr("llm_failed_topics", len(pendentes))
+
+    return {i: resultados[i] for i in range(len(dados))}
+
 if __name__ == "__main__":
     # Instanciando a classe Llama3
-    llm = Llama3()
+    max_concorrencia = 4
+    llm = Llama3(max_connections=max_concorrencia, cache_path=os.path.join(BASE_DIR, 'output', 'response_cache.sqlite'))
     
     # Carregando o arquivo de entrada em UTF-8
-    with open('topic_analysis.json', 'r', encoding='utf-8') as file_json:
+    with open(os.path.join(BASE_DIR, 'topic_analysis.json'), 'r', encoding='utf-8') as file_json:
         data = json.load(file_json)
 
-    # Processando os dados individualmente
-    resultado_final = topic_extract(llm, data)
+    # Processando os dados em lotes (vários tópicos por prompt)
+    resultado_final = topic_extract_batch(llm, data, max_concorrencia=max_concorrencia)
 
     # Salvando o JSON final com todos os tópicos identificados
-    with open('output/response.json', 'w', encoding='utf-8') as f:
+    with open(os.path.join(BASE_DIR, 'output', 'response.json'), 'w', encoding='utf-8') as f:
         json.dump(resultado_final, f, ensure_ascii=False, indent=4)
 
     # Exibindo o resultado final em UTF-8 para o console
@@ -1,43 +1,168 @@
 import os
 import json
+import time
+import threading
 import requests
-from transformers import AutoTokenizer
-from llama_index.core import Settings, Document
-from llama_index.embeddings.ollama import OllamaEmbedding
-from llama_index.llms.ollama import Ollama
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from .response_cache import ResponseCache
+from ..metrics import NULL_METRICS
 
 load_dotenv()
 
 class Llama3:
-    def __init__(self, logger: object = None, max_tokens: int = 4096):
+    def __init__(self, logger: object = None, max_tokens: int = 4096, max_connections: int = 10,
+                 options: dict = None, cache_path: str = None, cache_ttl: float = None,
+                 cache_max_entries: int = None, metrics: object = None):
         """
         Inicializa a classe Llama3.
 
         Args:
             logger (object): Logger para registrar logs (opcional).
             max_tokens (int): Número máximo de tokens que o modelo pode processar.
+            max_connections (int): Tamanho do pool de conexões HTTP reaproveitadas com o servidor.
+            options (dict): Opções de geração enviadas ao Ollama (temperature, seed...) (opcional).
+            cache_path (str): Arquivo SQLite do cache de respostas; sem ele o cache fica desabilitado.
+            cache_ttl (float): Tempo de vida das respostas em cache, em segundos (opcional).
+            cache_max_entries (int): Número máximo de respostas mantidas em cache (opcional).
+            metrics (Metrics): Coletor de métricas (latência, tokens, tentativas) (opcional).
         """
         self.__logger = logger
         self.max_tokens = max_tokens
+        self.options = options or {}
 
-        base_url = os.getenv("LLAMA_BASE_URL") or "http://127.0.0.1:11434"
-        request_timeout = float(os.getenv("LLAMA_REQUEST_TIMEOUT", 10))  
-        Settings.embed_model = OllamaEmbedding(
-            base_url=base_url,
-            model_name= os.getenv("EMBEDDED_MODEL") or "all-minilm",
-        )
-        Settings.tokenizer = AutoTokenizer.from_pretrained(
-            (os.getenv('TOKENIZER_MODEL') or 'neuralmind/bert-large-portuguese-cased'), 
-            do_lower_case=False,
-        )
-
-        self.__llm = Settings.llm = Ollama(
-            base_url=base_url, 
-            model=(os.getenv("LLM_MODEL") or "llama3"), 
-            request_timeout=request_timeout
-        )
-        self.tokenizer = AutoTokenizer.from_pretrained('neuralmind/bert-large-portuguese-cased')
+        # Cache persistente de prompt -> resposta (opcional)
+        self.cache = ResponseCache(cache_path, ttl=cache_ttl, max_entries=cache_max_entries) if cache_path else None
+
+        # Sessão HTTP compartilhada (reaproveita conexões entre prompts e entre threads)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Métricas de cada chamada (tempo até o primeiro token e latência total, em segundos)
+        self.call_metrics = []
+        # Métricas agregadas (percentis de latência, contagem de tokens...); desabilitadas por padrão
+        self.metrics = metrics or NULL_METRICS
+
+        self.base_url = os.getenv("LLAMA_BASE_URL") or "http://127.0.0.1:11434"
+        self.model = os.getenv("LLM_MODEL") or "llama3"
+        self.request_timeout = float(os.getenv("LLAMA_REQUEST_TIMEOUT", 10))
+
+        # O tokenizador e os objetos do llama_index são pesados (transformers, download de
+        # modelos) e send_prompt não precisa deles, então só são criados no primeiro uso
+        self.__tokenizer = None
+        self.__llm = None
+        self.__lazy_lock = threading.Lock()  # evita carregar duas vezes no modo concorrente
+        # Contagem de tokens dos preâmbulos fixos dos prompts, calculada uma única vez
+        self.__preamble_tokens = {}
+
+    @property
+    def tokenizer(self):
+        """Tokenizador (versão rápida, em Rust), carregado no primeiro uso e compartilhado com o llama_index."""
+        if self.__tokenizer is None:
+            with self.__lazy_lock:
+                if self.__tokenizer is None:
+                    from transformers import AutoTokenizer
+                    from llama_index.core import Settings
+
+                    self.__tokenizer = Settings.tokenizer = AutoTokenizer.from_pretrained(
+                        (os.getenv('TOKENIZER_MODEL') or 'neuralmind/bert-large-portuguese-cased'), 
+                        do_lower_case=False,
+                        use_fast=True,
+                    )
+        return self.__tokenizer
+
+    @property
+    def llm(self):
+        """LLM e embeddings do llama_index (Settings), configurados no primeiro uso."""
+        if self.__llm is None:
+            with self.__lazy_lock:
+                if self.__llm is None:
+                    from llama_index.core import Settings
+                    from llama_index.embeddings.ollama import OllamaEmbedding
+                    from llama_index.llms.ollama import Ollama
+
+                    Settings.embed_model = OllamaEmbedding(
+                        base_url=self.base_url,
+                        model_name= os.getenv("EMBEDDED_MODEL") or "all-minilm",
+                    )
+                    self.__llm = Settings.llm = Ollama(
+                        base_url=self.base_url, 
+                        model=self.model, 
+                        request_timeout=self.request_timeout
+                    )
+        return self.__llm
+
+    def count_tokens(self, texts: list) -> list:
+        """
+        Conta os tokens de vários textos de uma vez (tokenização em lote).
+
+        Args:
+            texts (list): Lista de textos.
+
+        Returns:
+            list: Número de tokens de cada texto, na mesma ordem.
+        """
+        if not texts:
+            return []
+        return [len(ids) for ids in self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    def preamble_tokens(self, preamble: str) -> int:
+        """Retorna o número de tokens de um preâmbulo fixo, tokenizando-o só na primeira vez."""
+        n_tokens = self.__preamble_tokens.get(preamble)
+        if n_tokens is None:
+            n_tokens = self.__preamble_tokens[preamble] = self.count_tokens([preamble])[0]
+        return n_tokens
+
+    def build_prompt(self, preamble: str, item: dict, text_field: str = "texto") -> str:
+        """
+        Monta o prompt (preâmbulo + JSON do item) respeitando o limite de tokens do modelo.
+
+        Só a parte variável é tokenizada a cada chamada. Se o prompt passar do limite, apenas o
+        campo de texto do item é encurtado; as palavras-chave e a estrutura do JSON ficam intactas.
+
+        Args:
+            preamble (str): Parte fixa do prompt (por exemplo, PROMPT_IDENTIFICACAO_TOPICO).
+            item (dict): Dados do tópico, serializados em JSON após o preâmbulo.
+            text_field (str): Campo do item que pode ser encurtado.
+
+        Returns:
+            str: O prompt pronto para envio.
+        """
+        budget = self.max_tokens - self.preamble_tokens(preamble)
+        # Sem ensure_ascii, os acentos vão como estão (e não como \uXXXX), então os tokens do texto
+        # dentro do JSON são praticamente os mesmos do texto sozinho, e o corte abaixo fica preciso
+        payload = json.dumps(item, ensure_ascii=False)
+        texto = item.get(text_field)
+        if not isinstance(texto, str):
+            # Sem um campo de texto para encurtar, o prompt inteiro é cortado se passar do limite
+            if self.count_tokens([payload])[0] <= budget:
+                return preamble + payload
+            return self.truncate_prompt(preamble + payload)
+
+        total, skeleton = self.count_tokens([payload, json.dumps({**item, text_field: ""}, ensure_ascii=False)])
+        if total <= budget:
+            return preamble + payload
+
+        if self.__logger:
+            self.__logger.warning(f"Prompt excede {self.max_tokens} tokens. Encurtando o campo '{text_field}'.")
+
+        # Corta o texto numa fronteira de token, usando os offsets do tokenizador rápido.
+        # O texto dentro do JSON pode render alguns tokens a mais (aspas e quebras de linha
+        # escapadas), então o corte é conferido e ajustado até caber no limite.
+        offsets = self.tokenizer(texto, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        keep = min(len(offsets), budget - skeleton)
+        while keep > 0:
+            payload = json.dumps({**item, text_field: texto[:offsets[keep - 1][1]]}, ensure_ascii=False)
+            excesso = self.count_tokens([payload])[0] - budget
+            if excesso <= 0:
+                break
+            keep -= excesso
+        else:
+            payload = json.dumps({**item, text_field: ""}, ensure_ascii=False)
+
+        return preamble + payload
 
     def truncate_prompt(self, prompt: str) -> str:
         """
@@ -49,58 +174,198 @@ class Llama3:
         Returns:
             str: O prompt truncado.
         """
-        tokens = self.tokenizer.encode(prompt, truncation=False)
+        encoding = self.tokenizer(prompt, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding["offset_mapping"]
 
-        if len(tokens) > self.max_tokens:
+        if len(offsets) > self.max_tokens:
             if self.__logger:
                 self.__logger.warning(f"Prompt excede {self.max_tokens} tokens. Truncando.")
-            # Truncar o número de tokens até o máximo permitido
-            tokens = tokens[:self.max_tokens]
-            prompt_truncado = self.tokenizer.decode(tokens, skip_special_tokens=True)
-            return prompt_truncado
+            # Truncar no fim do último token permitido, sem decodificar os tokens de volta
+            return prompt[:offsets[self.max_tokens - 1][1]]
 
         return prompt
 
-    def send_prompt(self, prompt: str) -> str:
+    def send_prompt(self, prompt: str, early_stop: bool = True, truncate: bool = True, accept=None) -> str:
         """
         Envia um prompt para a LLM e retorna a resposta.
 
+        A resposta é lida em streaming (NDJSON), pedaço a pedaço. Com `early_stop`, a geração é
+        interrompida assim que um objeto JSON completo no formato {"0": "..."} aparece no texto,
+        e só esse objeto é retornado, sem o comentário que o modelo costuma gerar depois.
+
         Args:
             prompt (str): O prompt a ser enviado para a LLM.
+            early_stop (bool): Interrompe a geração quando o JSON esperado estiver completo.
+            truncate (bool): Trunca o prompt ao limite de tokens (desnecessário para prompts de build_prompt).
+            accept (callable): Função que diz se a resposta serve para quem chamou (opcional). Só
+                respostas aceitas vão para o cache, e respostas em cache recusadas são pedidas de novo;
+                assim, uma nova tentativa com o mesmo prompt não recebe de volta a resposta recusada.
 
         Returns:
             str: A resposta da LLM.
         """
+        # Respostas já obtidas em execuções anteriores são reaproveitadas do cache
+        if self.cache is not None:
+            cache_key = ResponseCache.key(
+                self.model, prompt,
+                {"options": self.options, "max_tokens": self.max_tokens, "early_stop": early_stop},
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None and self.is_accepted(cached, accept):
+                self.metrics.incr("llm_cache_hits")
+                return cached
+
         # Truncar o prompt se exceder o limite de tokens
-        prompt = self.truncate_prompt(prompt)
+        if truncate:
+            prompt = self.truncate_prompt(prompt)
 
+        # O prompt completo só vai para o log em nível DEBUG (formatar e gravar prompts longos custa caro)
         if self.__logger:
-            self.__logger.info(f"Enviando prompt para a LLM: {prompt}")
+            self.__logger.debug("Enviando prompt para a LLM: %s", prompt)
 
+        payload = {"model": self.model, "prompt": prompt, "stream": True}
+        if self.options:
+            payload["options"] = self.options
+
+        inicio = time.perf_counter()
         try:
             # Fazendo a requisição para a LLM
-            response = requests.post(
-                f"{self.__llm.base_url}/api/generate",
-                json={"model": self.__llm.model, "prompt": prompt}
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                stream=True,
             )
 
-            # Log da resposta bruta para inspecionar
-            if self.__logger:
-                self.__logger.info(f"Resposta bruta do servidor: {response.text}")
-            
-            # Verificando a resposta
-            if response.status_code == 200:
-                return self.format_response(response.text)
-            else:
-                if self.__logger:
-                    self.__logger.error(f"Erro na resposta da LLM: {response.status_code} - {response.text}")
-                return f"Erro: {response.status_code} - {response.text}"
+            with response:
+                # Verificando a resposta
+                if response.status_code != 200:
+                    self.metrics.incr("llm_errors")
+                    if self.__logger:
+                        self.__logger.error(f"Erro na resposta da LLM: {response.status_code} - {response.text}")
+                    return f"Erro: {response.status_code} - {response.text}"
+
+                texto, primeiro_token, interrompida, uso = self.read_stream(response, early_stop)
 
         except requests.exceptions.RequestException as e:
+            self.metrics.incr("llm_errors")
             if self.__logger:
                 self.__logger.error(f"Erro ao enviar prompt: {e}")
             return f"Erro na comunicação com o servidor: {str(e)}"
 
+        fim = time.perf_counter()
+        self.call_metrics.append({
+            "ttft": (primeiro_token - inicio) if primeiro_token is not None else None,
+            "latency": fim - inicio,
+            "early_stop": interrompida,
+            **uso,
+        })
+
+        self.metrics.incr("llm_requests")
+        self.metrics.observe("llm_latency_seconds", fim - inicio)
+        if primeiro_token is not None:
+            self.metrics.observe("llm_ttft_seconds", primeiro_token - inicio)
+        if interrompida:
+            self.metrics.incr("llm_early_stops")
+        for nome, tokens in uso.items():
+            if tokens is not None:
+                self.metrics.incr(f"llm_{nome}", tokens)
+
+        # Log da resposta bruta para inspecionar
+        if self.__logger:
+            self.__logger.debug("Resposta bruta do servidor: %s", texto)
+
+        # Só respostas aceitas vão para o cache (erros e respostas recusadas nunca são armazenados)
+        if self.cache is not None and self.is_accepted(texto, accept):
+            self.cache.set(cache_key, texto)
+
+        return texto
+
+    def is_accepted(self, texto: str, accept=None) -> bool:
+        """Verifica se a resposta é válida e, se `accept` for informado, se quem chamou a aceita."""
+        return self.is_valid_response(texto) and (accept is None or accept(texto))
+
+    @staticmethod
+    def is_valid_response(texto: str) -> bool:
+        """Verifica se a resposta é um objeto JSON válido (e não uma mensagem de erro)."""
+        if texto.startswith("Erro"):
+            return False
+        try:
+            return isinstance(json.loads(texto), dict)
+        except json.JSONDecodeError:
+            return False
+
+    def read_stream(self, response, early_stop: bool = True):
+        """
+        Lê a resposta em streaming do Ollama, juntando os campos "response" de cada linha.
+
+        Args:
+            response: Resposta HTTP aberta com stream=True.
+            early_stop (bool): Para de ler assim que o JSON esperado estiver completo.
+
+        O uso de tokens vem da última linha do Ollama ("prompt_eval_count" e "eval_count"). Se a
+        geração for interrompida antes dela, os tokens gerados são estimados pelo número de pedaços
+        recebidos (o Ollama envia um token por linha) e os do prompt ficam como None.
+
+        Returns:
+            tuple: (texto, instante do primeiro token, se a geração foi interrompida,
+            uso de tokens {"prompt_tokens": ..., "completion_tokens": ...}).
+        """
+        partes = []
+        primeiro_token = None
+        uso = {"prompt_tokens": None, "completion_tokens": 0}
+
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                if self.__logger:
+                    self.__logger.error(f"Erro ao decodificar JSON: {e}")
+                return f"Erro: Resposta não está no formato JSON esperado. Conteúdo: {line.decode('utf-8', 'replace')}", primeiro_token, False, uso
+
+            pedaco = data.get("response", "")
+            if pedaco:
+                if primeiro_token is None:
+                    primeiro_token = time.perf_counter()
+                partes.append(pedaco)
+                uso["completion_tokens"] += 1
+
+                # Só vale a pena tentar o parse quando um objeto pode ter sido fechado
+                if early_stop and "}" in pedaco:
+                    objeto = self.extract_json_object("".join(partes))
+                    if objeto is not None:
+                        # Fechar a conexão interrompe a geração no servidor
+                        return objeto, primeiro_token, not data.get("done", False), uso
+
+            if data.get("done"):
+                uso["prompt_tokens"] = data.get("prompt_eval_count")
+                uso["completion_tokens"] = data.get("eval_count", uso["completion_tokens"])
+                break
+
+        return "".join(partes), primeiro_token, False, uso
+
+    @staticmethod
+    def extract_json_object(texto: str):
+        """
+        Procura no texto um objeto JSON completo no formato {"0": "Nome do tópico"}.
+
+        Returns:
+            str: O trecho do texto com o objeto JSON, ou None se ainda não houver um completo.
+        """
+        decoder = json.JSONDecoder()
+        inicio = texto.find("{")
+        while inicio != -1:
+            try:
+                objeto, fim = decoder.raw_decode(texto, inicio)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(objeto, dict) and objeto and all(isinstance(v, str) for v in objeto.values()):
+                    return texto[inicio:fim]
+            inicio = texto.find("{", inicio + 1)
+        return None
+
     def format_response(self, raw_response: str) -> str:
         """
         Formata a resposta recebida da LLM, concatenando todos os campos "response".
@@ -111,19 +376,19 @@ class Llama3:
         Returns:
             str: A resposta formatada.
         """
-        formatted_response = ""
+        partes = []
         try:
             # Quebrando a resposta bruta em linhas e processando cada linha
             for line in raw_response.splitlines():
                 # Parse cada linha de JSON e extrai o campo "response"
                 data = json.loads(line)
-                formatted_response += data.get("response", "")
+                partes.append(data.get("response", ""))
         except json.JSONDecodeError as e:
             if self.__logger:
                 self.__logger.error(f"Erro ao decodificar JSON: {e}")
             return f"Erro: Resposta não está no formato JSON esperado. Conteúdo: {raw_response}"
 
-        return formatted_response
+        return "".join(partes)
 
     def response_to_json(self, resposta_llm, arquivo_saida):
         """
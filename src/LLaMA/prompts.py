@@ -23,3 +23,30 @@ Me retorne somente o formato em JSON.
 
 Agora, analise esta entrada:
 """
+
+PROMPT_IDENTIFICACAO_TOPICOS_LOTE = """
+Você é um assistente que identifica tópicos com base em uma lista de palavras-chave e um texto representativo de tokens fornecido.
+
+Eu vou fornecer vários tópicos de uma vez, cada um identificado por um índice. Cada tópico tem uma lista de palavras-chave e uma string de tokens representando o seu contexto. Sua tarefa é analisar cada tópico separadamente e identificar o nome mais relevante para ele.
+
+Aqui está o que você deve fazer:
+1. Para cada índice, analise a lista de palavras-chave e a string de tokens associada.
+2. Use as palavras-chave e o texto representativo para identificar o tópico mais relevante.
+3. Retorne um único JSON que associe cada índice recebido ao nome do tópico correspondente.
+
+Modelo de entrada:
+{
+    "3": {"palavras-chave": ["palavra1", "palavra2"], "texto": "string de tokens"},
+    "7": {"palavras-chave": ["palavra3", "palavra4"], "texto": "string de tokens"}
+}
+
+A sua resposta deve ser neste modelo JSON, com exatamente os mesmos índices da entrada:
+{
+    "3": "Nome do tópico",
+    "7": "Nome do tópico"
+}
+
+Me retorne somente o formato em JSON.
+
+Agora, analise esta entrada:
+"""
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    def __init__(self, path: str, ttl: float = None, max_entries: int = None):
+        """
+        Cache persistente (SQLite) das respostas da LLM.
+
+        Args:
+            path (str): Caminho do arquivo SQLite.
+            ttl (float): Tempo de vida das entradas, em segundos (opcional).
+            max_entries (int): Número máximo de entradas mantidas; as menos usadas saem primeiro (opcional).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # A mesma conexão é usada pelas threads do modo concorrente, protegida por um lock
+        self.__lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, prompt: str, options: dict = None) -> str:
+        """
+        Gera a chave de cache a partir do modelo, do hash do prompt e das opções de geração.
+
+        Args:
+            model (str): Nome do modelo.
+            prompt (str): Prompt enviado.
+            options (dict): Opções de geração que alteram a resposta.
+
+        Returns:
+            str: A chave de cache.
+        """
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        options_json = json.dumps(options or {}, sort_keys=True)
+        return hashlib.sha256(f"{model}\0{prompt_hash}\0{options_json}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        """
+        Busca uma resposta no cache.
+
+        Returns:
+            str: A resposta armazenada, ou None se não existir ou tiver expirado.
+        """
+        now = time.time()
+        with self.__lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str):
+        """Armazena uma resposta no cache e aplica a política de despejo."""
+        now = time.time()
+        with self.__lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self.conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove as entradas expiradas e, se necessário, as menos usadas além de `max_entries`.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        removed = 0
+        with self.__lock:
+            if self.ttl is not None:
+                cursor = self.conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+                )
+                removed += cursor.rowcount
+            if self.max_entries is not None:
+                cursor = self.conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += cursor.rowcount
+            self.conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        """Retorna as estatísticas de acertos e falhas do cache."""
+        total = self.hits + self.misses
+        with self.__lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self.__lock:
+            self.conn.close()
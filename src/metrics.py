@@ -0,0 +1,211 @@
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import threading
+import time
+
+# Percentis exportados para cada série de medições
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def percentile(sorted_values, q):
+    """Percentil `q` (entre 0 e 1) de uma lista já ordenada, com interpolação linear."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+class _Timer:
+    """Mede o tempo de um bloco `with` e registra a duração numa série de medições."""
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Stage(_Timer):
+    """Mede uma etapa inteira: tempo de parede e número de itens processados."""
+    __slots__ = ("items",)
+
+    def __enter__(self):
+        self.items = 0
+        return super().__enter__()
+
+    def add(self, n=1):
+        self.items += n
+
+    def __exit__(self, *exc):
+        self.metrics.record_stage(self.name, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class _NullStage:
+    """Versão desabilitada de _Timer/_Stage: não mede nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, n=1):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        """
+        Coletor leve de métricas de desempenho (contadores, séries de medições e etapas).
+
+        Com `enabled=False`, todos os métodos retornam imediatamente e `timer`/`stage`
+        devolvem um objeto vazio compartilhado, então a instrumentação custa praticamente nada.
+        O coletor é seguro para uso entre threads (topic_extract com concorrência).
+
+        Args:
+            enabled (bool): Se as métricas devem ser registradas.
+        """
+        self.enabled = enabled
+        self.counters = {}
+        self.observations = {}
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        """Soma `value` ao contador `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """Registra uma medição (por exemplo, uma latência em segundos) na série `name`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.observations.setdefault(name, []).append(value)
+
+    def record_stage(self, name, seconds, items=0):
+        """Acumula o tempo de parede e o número de itens de uma etapa."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "items": 0, "runs": 0})
+            stage["seconds"] += seconds
+            stage["items"] += items
+            stage["runs"] += 1
+
+    def timer(self, name):
+        """Context manager que registra a duração do bloco na série `name`."""
+        return _Timer(self, name) if self.enabled else _NULL_STAGE
+
+    def stage(self, name):
+        """Context manager de uma etapa; chame `.add(n)` no objeto retornado para contar os itens."""
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def report(self):
+        """
+        Resume as métricas registradas.
+
+        Returns:
+            dict: Contadores, resumo de cada série (contagem, soma, média, mínimo, máximo e
+            percentis) e etapas (segundos, itens e itens por segundo).
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            observations = {name: sorted(values) for name, values in self.observations.items()}
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+
+        summaries = {}
+        for name, values in observations.items():
+            summary = {
+                "count": len(values),
+                "sum": sum(values),
+                "mean": sum(values) / len(values),
+                "min": values[0],
+                "max": values[-1],
+            }
+            for q in QUANTILES:
+                summary[f"p{q * 100:g}"] = percentile(values, q)
+            summaries[name] = summary
+
+        for stage in stages.values():
+            stage["items_per_second"] = stage["items"] / stage["seconds"] if stage["seconds"] else None
+
+        return {"counters": counters, "observations": summaries, "stages": stages}
+
+    def to_prometheus(self, prefix="tcc_"):
+        """Exporta o relatório no formato texto do Prometheus."""
+        def metric_name(name):
+            return prefix + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+        report = self.report()
+        lines = []
+        for name, value in sorted(report["counters"].items()):
+            name = metric_name(name if name.endswith("_total") else f"{name}_total")
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        for name, summary in sorted(report["observations"].items()):
+            name = metric_name(name)
+            lines.append(f"# TYPE {name} summary")
+            lines += [f'{name}{{quantile="{q:g}"}} {summary[f"p{q * 100:g}"]}' for q in QUANTILES]
+            lines += [f"{name}_sum {summary['sum']}", f"{name}_count {summary['count']}"]
+        for stage_name, stage in sorted(report["stages"].items()):
+            name = metric_name(f"stage_{stage_name}")
+            lines += [f"# TYPE {name}_seconds gauge", f"{name}_seconds {stage['seconds']}",
+                      f"# TYPE {name}_items gauge", f"{name}_items {stage['items']}"]
+        return "\n".join(lines) + "\n"
+
+    def save(self, path):
+        """Salva o relatório em JSON, ou no formato do Prometheus se o arquivo terminar em .prom."""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.report(), f, ensure_ascii=False, indent=4)
+
+
+# Coletor desabilitado, usado como padrão pelas classes instrumentadas
+NULL_METRICS = Metrics(enabled=False)
+
+
+@contextlib.contextmanager
+def profiled(path=None, top=20):
+    """
+    Executa o bloco sob o cProfile (se `path` for informado) e salva as estatísticas em `path`.
+
+    O arquivo pode ser aberto com `python -m pstats` ou o snakeviz. As `top` funções com maior
+    tempo acumulado também vão para o log. Sem `path`, o bloco roda sem profiling.
+    """
+    if not path:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        resumo = io.StringIO()
+        pstats.Stats(profiler, stream=resumo).sort_stats("cumulative").print_stats(top)
+        logging.info("Perfil salvo em %s.\n%s", path, resumo.getvalue())
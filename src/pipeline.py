@@ -0,0 +1,324 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import time
+
+from src.metrics import NULL_METRICS
+
+STAGES = ["collect", "combine", "preprocess", "filter", "topics", "label"]
+
+# Opções que só afetam o desempenho, não o resultado (ficam fora da impressão digital)
+PERFORMANCE_OPTIONS = {"workers", "n_process", "batch_size", "chunk_size", "concurrency"}
+
+# Opções da etapa de tópicos que não vão para o bertopic_model (armazenamento e limites do modo incremental)
+TOPIC_INCREMENTAL_OPTIONS = {"dtype", "max_outlier_ratio", "max_drift", "min_sample"}
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Hash do conteúdo de um arquivo (ou de todos os arquivos de um diretório)."""
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    for file_path in paths:
+        digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_jsonl(path):
+    """Lê um arquivo JSONL inteiro como lista."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path, items):
+    """Grava uma lista em JSONL (um item compacto por linha)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+
+def load_collector():
+    """Importa data/collect-data.py (o nome com hífen impede o import direto)."""
+    spec = importlib.util.spec_from_file_location("collect_data", os.path.join(ROOT_DIR, "data", "collect-data.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Pipeline:
+    def __init__(self, work_dir, config=None, force=(), metrics=None, refit_topics=False):
+        """
+        Pipeline completo: coleta -> combinação -> pré-processamento -> filtragem -> tópicos -> rótulos da LLM.
+
+        Cada etapa tem uma impressão digital calculada a partir da sua configuração e do conteúdo
+        dos seus arquivos de entrada. Se a impressão digital for a mesma da última execução e as
+        saídas existirem, a etapa é pulada; assim, só são recalculadas as etapas afetadas por uma
+        mudança e as que vêm depois delas. Os dados intermediários circulam em JSONL compacto.
+
+        Na etapa de tópicos, se só entraram documentos novos desde o último ajuste (com a mesma
+        configuração), o modelo salvo atribui os tópicos a eles (IncrementalTopicAssigner), e o
+        ajuste completo só é refeito quando os limites de outliers ou de desvio são ultrapassados.
+
+        Args:
+            work_dir (str): Diretório dos arquivos intermediários e do manifesto.
+            config (dict): Configuração por etapa, por exemplo {"collect": {"profiles": [...]}}.
+            force (iterable): Etapas a recalcular mesmo que estejam atualizadas.
+            metrics (Metrics): Coletor de métricas repassado ao pré-processador e à LLM (opcional).
+            refit_topics (bool): Refaz o ajuste completo do BERTopic, mesmo que o modelo salvo ainda
+                sirva para atribuir os tópicos dos documentos novos.
+        """
+        self.work_dir = work_dir
+        self.config = {stage: {} for stage in STAGES}
+        for stage, values in (config or {}).items():
+            self.config[stage].update(values)
+        self.force = set(force)
+        self.refit_topics = refit_topics
+        if refit_topics:
+            self.force.add("topics")
+        self.metrics = metrics or NULL_METRICS
+
+        os.makedirs(work_dir, exist_ok=True)
+        self.manifest_path = self.path("manifest.json")
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+        self._preprocessor = None
+
+    def path(self, *names):
+        return os.path.join(self.work_dir, *names)
+
+    @property
+    def preprocessor(self):
+        if self._preprocessor is None:
+            from src.preprocessors.preprocessing import PrePreprocessor
+            self._preprocessor = PrePreprocessor(
+                batch_size=self.config["preprocess"].get("batch_size", 256),
+                n_process=self.config["preprocess"].get("n_process", 1),
+                cache_path=self.path("preprocessing_cache.sqlite"),
+                metrics=self.metrics,
+            )
+        return self._preprocessor
+
+    def fingerprint(self, stage, inputs):
+        """Impressão digital da etapa: configuração + conteúdo das entradas."""
+        payload = json.dumps({
+            "stage": stage,
+            "config": {k: v for k, v in self.config[stage].items() if k not in PERFORMANCE_OPTIONS},
+            "inputs": [file_hash(path) for path in inputs],
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def run_stage(self, stage, inputs, outputs, func):
+        """
+        Executa uma etapa, a menos que ela já esteja atualizada.
+
+        Returns:
+            bool: True se a etapa foi executada, False se foi pulada.
+        """
+        fingerprint = self.fingerprint(stage, inputs)
+        previous = self.manifest.get(stage, {})
+        up_to_date = previous.get("fingerprint") == fingerprint and all(os.path.exists(p) for p in outputs)
+        if up_to_date and stage not in self.force:
+            logging.info("Etapa %s atualizada; pulando.", stage)
+            return False
+
+        logging.info("Executando a etapa %s...", stage)
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        self.metrics.record_stage(f"pipeline_{stage}", elapsed)
+
+        self.manifest[stage] = {"fingerprint": fingerprint, "outputs": outputs, "seconds": elapsed, "finished_at": time.time()}
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+        logging.info("Etapa %s concluída em %.2f segundos.", stage, elapsed)
+        return True
+
+    def run(self, until="label", raw_files=None):
+        """
+        Executa o pipeline até a etapa `until` (inclusive).
+
+        Args:
+            until (str): Última etapa a executar.
+            raw_files (list): Arquivos brutos já coletados (.json ou .jsonl); se informados, a coleta é pulada.
+        """
+        stages = STAGES[:STAGES.index(until) + 1]
+
+        # Coleta
+        if raw_files:
+            raw_paths = list(raw_files)
+        else:
+            collect_config = self.config["collect"]
+            raw_dir = self.path("raw")
+            collector = load_collector()
+            profiles = collect_config.get("profiles") or collector.PROFILES
+            raw_paths = [os.path.join(raw_dir, f"{profile}.jsonl") for profile in profiles]
+
+            def collect():
+                checkpoint_path = os.path.join(raw_dir, "checkpoint.json")
+                if "collect" in self.force and os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)  # força uma coleta nova de todos os perfis
+                results = collector.collect(profiles, raw_dir,
+                                            max_workers=collect_config.get("workers", 4),
+                                            limit=collect_config.get("limit", 10000))
+                for result in results.values():
+                    if "seconds" in result:
+                        self.metrics.observe("collect_profile_seconds", result["seconds"])
+                        self.metrics.incr("collect_posts", result["posts"])
+                failed = [profile for profile, result in results.items() if "error" in result]
+                if failed:
+                    raise RuntimeError(f"Falha na coleta dos perfis: {', '.join(failed)}")
+
+            self.run_stage("collect", [], raw_paths, collect)
+        if stages[-1] == "collect":
+            return
+
+        # Combinação dos perfis num único arquivo
+        combined_path = self.path("combined.jsonl")
+
+        def combine():
+            with open(combined_path, 'w', encoding='utf-8') as out_file:
+                for raw_path in raw_paths:
+                    for row in self.preprocessor.iter_data(raw_path):
+                        out_file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        self.run_stage("combine", raw_paths, [combined_path], combine)
+        if stages[-1] == "combine":
+            return
+
+        # Pré-processamento (em streaming)
+        processed_path = self.path("processed.jsonl")
+
+        def preprocess():
+            self.preprocessor.preprocess_file(combined_path, processed_path,
+                                              chunk_size=self.config["preprocess"].get("chunk_size", 1000))
+            logging.info("Cache do pré-processamento: %s", self.preprocessor.cache_stats())
+
+        self.run_stage("preprocess", [combined_path], [processed_path], preprocess)
+        if stages[-1] == "preprocess":
+            return
+
+        # Remoção de textos vazios e duplicatas
+        docs_path = self.path("docs.jsonl")
+        duplicates_path = self.path("duplicates.json")
+
+        def filter_docs():
+            docs = self.preprocessor.remove_empty_strings(read_jsonl(processed_path))
+            docs, duplicate_map = self.preprocessor.remove_duplicates(
+                docs, threshold=self.config["filter"].get("threshold", 0.8)
+            )
+            write_jsonl(docs_path, docs)
+            with open(duplicates_path, 'w', encoding='utf-8') as f:
+                json.dump(duplicate_map, f)
+            logging.info("%d documentos após a filtragem (%d duplicatas removidas).", len(docs), len(duplicate_map))
+
+        self.run_stage("filter", [processed_path], [docs_path, duplicates_path], filter_docs)
+        if stages[-1] == "filter":
+            return
+
+        # Modelagem de tópicos
+        model_path = self.path("model")
+        topics_path = self.path("topics.jsonl")
+        llm_input_path = self.path("topic_analysis.json")
+        # Hashes dos documentos de topics.jsonl (na mesma ordem) e estado do último ajuste completo
+        topic_hashes_path = self.path("topics_docs.json")
+        fit_state_path = self.path("topics_fit.json")
+
+        def topics():
+            from src.topics.embeddings import EmbeddingStore, document_hash
+            from src.topics.incremental import IncrementalTopicAssigner
+            from src.topics.modeling import bertopic_model
+
+            topic_config = self.config["topics"]
+            docs = read_jsonl(docs_path)
+            doc_hashes = [document_hash(doc) for doc in docs]
+            store = EmbeddingStore(self.path("embeddings"), dtype=topic_config.get("dtype", "float32"))
+            params = {k: v for k, v in topic_config.items() if k not in TOPIC_INCREMENTAL_OPTIONS}
+
+            fit_state = None
+            if all(os.path.exists(p) for p in (model_path, topics_path, topic_hashes_path, fit_state_path)):
+                with open(fit_state_path, 'r', encoding='utf-8') as f:
+                    fit_state = json.load(f)
+
+            # O modo incremental vale quando a configuração é a mesma do último ajuste e nenhum
+            # documento do treino saiu do corpus (só entraram documentos novos)
+            fitted = set(fit_state["docs"]) if fit_state else set()
+            incremental = (not self.refit_topics and fit_state is not None
+                           and fit_state["params"] == params and fitted <= set(doc_hashes))
+
+            if incremental:
+                # Todos os documentos que entraram desde o último ajuste, e não só os da última
+                # coleta, para que o teste de desvio tenha uma amostra grande o bastante
+                new_docs = list(dict.fromkeys(doc for doc, h in zip(docs, doc_hashes) if h not in fitted))
+                assigner = IncrementalTopicAssigner(
+                    model_path, store,
+                    **{k: topic_config[k] for k in ("max_outlier_ratio", "max_drift", "min_sample") if k in topic_config},
+                )
+                result = assigner.update(new_docs, docs, **params)
+                logging.info("%d documentos desde o último ajuste: %.1f%% outliers, desvio %.3f (ruído %.3f)%s.",
+                             len(new_docs), 100 * result["outlier_ratio"], result["drift"], result["drift_noise"],
+                             "; modelo reajustado" if result["refitted"] else "")
+                topic_model = assigner.model
+                refitted = result["refitted"]
+                if refitted:
+                    doc_topics = result["all_topics"]
+                else:
+                    # Os documentos já conhecidos mantêm o tópico da execução anterior
+                    with open(topic_hashes_path, 'r', encoding='utf-8') as f:
+                        known = dict(zip(json.load(f), read_jsonl(topics_path)))
+                    known.update(zip((document_hash(doc) for doc in new_docs), result["topics"]))
+                    doc_topics = [known[h] for h in doc_hashes]
+            else:
+                doc_topics, _, topic_model = bertopic_model(docs, embeddings=store.get(docs), **params)
+                topic_model.save(model_path)
+                refitted = True
+
+            if refitted:
+                with open(fit_state_path, 'w', encoding='utf-8') as f:
+                    json.dump({"params": params, "docs": sorted(set(doc_hashes))}, f)
+            write_jsonl(topics_path, [int(topic) for topic in doc_topics])
+            with open(topic_hashes_path, 'w', encoding='utf-8') as f:
+                json.dump(doc_hashes, f)
+
+            # Entrada da LLM: palavras-chave e primeiro documento representativo de cada tópico
+            info = topic_model.get_topic_info()
+            llm_input = [
+                {"palavras-chave": list(row["Representation"]), "texto": row["Representative_Docs"][0]}
+                for _, row in info.iterrows()
+            ]
+            with open(llm_input_path, 'w', encoding='utf-8') as f:
+                json.dump(llm_input, f, ensure_ascii=False)
+
+        self.run_stage("topics", [docs_path], [model_path, topics_path, llm_input_path, topic_hashes_path], topics)
+        if stages[-1] == "topics":
+            return
+
+        # Rótulos dos tópicos pela LLM
+        labels_path = self.path("response.json")
+
+        def label():
+            from src.LLaMA.agent import topic_extract_batch
+            from src.LLaMA.llama import Llama3
+
+            label_config = self.config["label"]
+            concurrency = label_config.get("concurrency", 4)
+            llm = Llama3(max_connections=concurrency, cache_path=self.path("llm_cache.sqlite"), metrics=self.metrics)
+            with open(llm_input_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            labels = topic_extract_batch(llm, data, max_concorrencia=concurrency)
+            with open(labels_path, 'w', encoding='utf-8') as f:
+                json.dump(labels, f, ensure_ascii=False, indent=4)
+
+        self.run_stage("label", [llm_input_path], [labels_path], label)
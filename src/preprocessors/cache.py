@@ -0,0 +1,125 @@
+import hashlib
+import sqlite3
+import time
+
+
+class PreprocessingCache:
+    def __init__(self, path, config_key, max_entries=None):
+        """
+        Cache persistente (SQLite) dos resultados de pré-processamento.
+
+        As chaves são o hash do texto bruto junto com a configuração do pré-processamento
+        (modelo do SpaCy, stemmer, regex), então qualquer mudança de configuração invalida
+        as entradas antigas, que acabam removidas pela política de despejo.
+
+        Args:
+            path (str): Caminho do arquivo SQLite.
+            config_key (str): Identificador da configuração do pré-processamento.
+            max_entries (int): Número máximo de entradas mantidas (opcional).
+        """
+        self.path = path
+        self.config_key = config_key
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries (last_used)")
+        self.conn.commit()
+
+    def key(self, text):
+        """Gera a chave de cache para um texto bruto."""
+        return hashlib.sha256(f"{self.config_key}\0{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, keys, chunk_size=500):
+        """
+        Busca várias chaves de uma vez.
+
+        Returns:
+            dict: Mapeamento chave -> texto processado, apenas para as chaves encontradas.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update(rows)
+
+        # Atualiza o último uso das entradas encontradas (para o despejo LRU)
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(now, k) for k in found]
+            )
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key):
+        """Busca uma única chave. Retorna None se não estiver no cache."""
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items):
+        """Grava pares (chave, texto processado) no cache."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, last_used) VALUES (?, ?, ?)",
+            [(key, value, now) for key, value in items],
+        )
+        self.conn.commit()
+        if self.max_entries is not None:
+            self.evict(max_entries=self.max_entries)
+
+    def evict(self, max_entries=None, older_than=None):
+        """
+        Remove entradas do cache.
+
+        Args:
+            max_entries (int): Mantém apenas as `max_entries` entradas usadas mais recentemente.
+            older_than (float): Remove entradas não usadas há mais de `older_than` segundos.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        removed = 0
+        if older_than is not None:
+            cursor = self.conn.execute(
+                "DELETE FROM entries WHERE last_used < ?", (time.time() - older_than,)
+            )
+            removed += cursor.rowcount
+        if max_entries is not None:
+            excess = len(self) - max_entries
+            if excess > 0:
+                cursor = self.conn.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY last_used ASC LIMIT ?)", (excess,)
+                )
+                removed += cursor.rowcount
+        self.conn.commit()
+        return removed
+
+    def stats(self):
+        """Retorna as estatísticas de acertos e falhas do cache."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
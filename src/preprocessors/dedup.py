@@ -0,0 +1,138 @@
+import itertools
+import zlib
+import numpy as np
+
+
+def shingles(text, shingle_size=2):
+    """Gera o conjunto de n-gramas de tokens (shingles) de um texto já processado."""
+    tokens = text.split()
+    if len(tokens) <= shingle_size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+
+
+def jaccard(a, b):
+    """Similaridade de Jaccard entre dois conjuntos."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    def __init__(self, num_perm=128, bands=32, seed=42):
+        """
+        Índice MinHash/LSH para encontrar documentos quase duplicados em tempo aproximadamente linear.
+
+        As assinaturas usam hashing multiplicativo (a * x + b mod 2^64, 32 bits mais altos), com
+        `num_perm` funções de hash divididas em `bands` faixas. Dois documentos viram candidatos
+        quando coincidem em todos os valores de pelo menos uma faixa.
+
+        Args:
+            num_perm (int): Número de funções de hash da assinatura.
+            bands (int): Número de faixas do LSH (precisa dividir `num_perm`).
+            seed (int): Semente das funções de hash, para resultados reproduzíveis.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm deve ser múltiplo de bands.")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """Calcula a assinatura MinHash de um conjunto de shingles."""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingle_set), dtype=np.uint64, count=len(shingle_set)
+        )
+        values = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> np.uint64(32)
+        return values.min(axis=1)
+
+    def candidate_buckets(self, signatures):
+        """
+        Agrupa as assinaturas por faixa e retorna os baldes com mais de um documento.
+
+        Args:
+            signatures (dict): Mapeamento índice do documento -> assinatura MinHash.
+
+        Returns:
+            set: Tuplas de índices (em ordem crescente) que caíram no mesmo balde em alguma faixa.
+        """
+        groups = set()
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets = {}
+            for index, signature in signatures.items():
+                buckets.setdefault(signature[start:start + self.rows].tobytes(), []).append(index)
+            groups.update(tuple(sorted(bucket)) for bucket in buckets.values() if len(bucket) > 1)
+        return groups
+
+    def candidate_pairs(self, signatures):
+        """
+        Retorna os pares de documentos candidatos (todos os pares de cada balde).
+
+        Returns:
+            set: Pares (i, j), com i < j, que caíram no mesmo balde em alguma faixa.
+        """
+        return {pair for bucket in self.candidate_buckets(signatures) for pair in itertools.combinations(bucket, 2)}
+
+
+def find_duplicates(texts, threshold=0.8, shingle_size=2, num_perm=128, bands=32):
+    """
+    Encontra duplicatas exatas e quase duplicatas numa lista de textos processados.
+
+    Args:
+        texts (list): Lista de textos (tokens separados por espaço).
+        threshold (float): Similaridade de Jaccard mínima entre os shingles para considerar duplicata.
+        shingle_size (int): Tamanho dos n-gramas de tokens.
+        num_perm (int): Número de funções de hash do MinHash.
+        bands (int): Número de faixas do LSH.
+
+    Returns:
+        dict: Mapeamento índice da duplicata -> índice do documento canônico (a primeira ocorrência do grupo).
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # O documento de menor índice vira o canônico do grupo
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # Duplicatas exatas (mesmo texto normalizado)
+    first_seen = {}
+    for i, text in enumerate(texts):
+        key = " ".join(text.split())
+        if key in first_seen:
+            union(first_seen[key], i)
+        else:
+            first_seen[key] = i
+
+    # Quase duplicatas, entre os textos únicos
+    lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+    shingle_sets = {}
+    signatures = {}
+    for i in first_seen.values():
+        shingle_set = shingles(texts[i], shingle_size)
+        if shingle_set:
+            shingle_sets[i] = shingle_set
+            signatures[i] = lsh.signature(shingle_set)
+
+    # Cada documento é comparado com todos os outros do balde: um colega de balde pode ser só uma
+    # colisão do LSH, então ligar todos ao primeiro do balde deixaria de conferir os pares verdadeiros.
+    # Os pares que já estão no mesmo grupo são pulados sem calcular o Jaccard.
+    for bucket in lsh.candidate_buckets(signatures):
+        for a, i in enumerate(bucket):
+            for j in bucket[a + 1:]:
+                if find(i) != find(j) and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                    union(i, j)
+
+    return {i: find(i) for i in range(len(texts)) if find(i) != i}
@@ -1,25 +1,179 @@
-import spacy
 import json
 import re
 import os
-import nltk
-from nltk.stem import PorterStemmer
+import hashlib
+import functools
+from importlib.metadata import version
 
-nltk.download('punkt')
+from .cache import PreprocessingCache
+from ..metrics import NULL_METRICS
+
+# Modelo do SpaCy para português. O parser e o NER não são usados (só lemas e stopwords),
+# então ficam desabilitados.
+SPACY_MODEL = "pt_core_news_sm"
+DISABLED_COMPONENTS = ["parser", "ner"]
+
+# Expressões regulares usadas na limpeza do texto
+URL_PATTERN = r"http\S+|www\S+|https\S+"
+MENTION_PATTERN = r"@\w+"
+PUNCTUATION_PATTERN = r"[^\w\s]"
+EMOJI_PATTERN = ("["
+                 u"\U0001F600-\U0001F64F"  # Emoticons
+                 u"\U0001F300-\U0001F5FF"  # Símbolos e pictogramas
+                 u"\U0001F680-\U0001F6FF"  # Transporte e símbolos de mapas
+                 u"\U0001F1E0-\U0001F1FF"  # Bandeiras (sinalizadores)
+                 u"\U00002500-\U00002BEF"  # Símbolos diversos
+                 u"\U00002702-\U000027B0"  # Mais símbolos diversos
+                 u"\U000024C2-\U0001F251"  # Letras circundadas
+                 "]+")
+
+# Versões pré-compiladas, reaproveitadas em todas as chamadas
+EMOJI_REGEX = re.compile(EMOJI_PATTERN, flags=re.UNICODE)
+URL_REGEX = re.compile(URL_PATTERN, flags=re.MULTILINE)
+MENTION_REGEX = re.compile(MENTION_PATTERN)
+PUNCTUATION_REGEX = re.compile(PUNCTUATION_PATTERN)
 
 class PrePreprocessor:
-    def __init__(self, language="pt"):
-        # Carrega o modelo de linguagem do SpaCy para português
-        self.nlp = spacy.load(f"pt_core_news_sm")
+    def __init__(self, language="pt", batch_size=256, n_process=1, cache_path=None, cache_max_entries=None,
+                 stem_cache_size=100_000, metrics=None):
+        # O SpaCy e o NLTK são importados e carregados só no primeiro uso (ver `nlp` e `stemmer`),
+        # para que importar o módulo e instanciar a classe seja rápido
+        self._nlp = None
+        self._stemmer = None
+
+        # Configuração do processamento em lote (nlp.pipe)
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+        # Como o vocabulário do corpus se repete muito ("mulher", "aborto", "feminista"...), o
+        # resultado de cada lema fica memorizado numa tabela LRU limitada, compartilhada entre
+        # todos os documentos desta instância (lru_cache é seguro para uso entre threads).
+        self.stem = functools.lru_cache(maxsize=stem_cache_size)(self._stem)
+
+        # Cache persistente dos textos já processados (opcional), aberto só no primeiro uso (ver `cache`)
+        self.cache_path = cache_path
+        self.cache_max_entries = cache_max_entries
+        self._cache = None
+
+        # Métricas de desempenho (tempo do regex e do SpaCy, documentos por segundo); desabilitadas por padrão
+        self.metrics = metrics or NULL_METRICS
+
+    @property
+    def cache(self):
+        """Cache persistente do pré-processamento, aberto no primeiro uso (ou None se desabilitado)."""
+        if self._cache is None and self.cache_path:
+            self._cache = PreprocessingCache(self.cache_path, self.config_fingerprint(),
+                                             max_entries=self.cache_max_entries)
+        return self._cache
+
+    @property
+    def nlp(self):
+        """Modelo de linguagem do SpaCy, carregado no primeiro uso."""
+        if self._nlp is None:
+            import spacy
+            self._nlp = spacy.load(SPACY_MODEL, disable=DISABLED_COMPONENTS)
+        return self._nlp
+
+    @property
+    def stemmer(self):
+        """Stemmer do NLTK, criado no primeiro uso (não guarda estado, então é reaproveitado)."""
+        if self._stemmer is None:
+            from nltk.stem import PorterStemmer
+            self._stemmer = PorterStemmer()
+        return self._stemmer
+
+    def _stem(self, token):
+        """Aplica o stemming a um lema (sem memorização; use `stem`)."""
+        return self.stemmer.stem(token)
+
+    def config_fingerprint(self):
+        """Gera um identificador da configuração do pré-processamento (modelo, stemmer e regex)."""
+        # As versões vêm dos metadados dos pacotes, sem precisar importar o SpaCy nem carregar o modelo
+        config = {
+            "spacy": version("spacy"),
+            "model": f"{SPACY_MODEL}-{version(SPACY_MODEL)}",
+            "disabled": DISABLED_COMPONENTS,
+            "stemmer": f"nltk-{version('nltk')}.PorterStemmer",
+            "patterns": [URL_PATTERN, MENTION_PATTERN, PUNCTUATION_PATTERN, EMOJI_PATTERN],
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
 
     def load_data(self, file_path):
-        """Carrega os dados de postagens de um arquivo JSON."""
+        """Carrega os dados de postagens de um arquivo JSON ou JSONL."""
         if file_path.endswith(".json"):
             with open(file_path, "r", encoding="utf-8") as f:
                 json_data = json.load(f)
                 self.data = json_data
+        elif file_path.endswith(".jsonl"):
+            self.data = list(self.iter_data(file_path))
         else:
-            raise ValueError("Formato de arquivo não suportado. Use .json.")
+            raise ValueError("Formato de arquivo não suportado. Use .json ou .jsonl.")
+
+    def iter_data(self, file_path, read_size=65536):
+        """
+        Lê as postagens uma a uma, sem carregar o arquivo inteiro na memória.
+        Aceita um array JSON (.json) ou uma postagem por linha (.jsonl).
+        """
+        if file_path.endswith(".jsonl"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        elif file_path.endswith(".json"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                yield from self._iter_json_array(f, read_size)
+        else:
+            raise ValueError("Formato de arquivo não suportado. Use .json ou .jsonl.")
+
+    def _iter_json_array(self, f, read_size):
+        """Decodifica incrementalmente os elementos de um array JSON lido em blocos."""
+        decoder = json.JSONDecoder()
+        buffer = ''
+        started = False
+
+        while True:
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer += chunk
+
+            # Procura o '[' de abertura do array
+            if not started:
+                buffer = buffer.lstrip()
+                if not buffer:
+                    if eof:
+                        return
+                    continue
+                if buffer[0] != '[':
+                    raise ValueError("O arquivo JSON deve conter uma lista de postagens.")
+                buffer = buffer[1:]
+                started = True
+
+            # Extrai todos os elementos completos que já estão no buffer
+            while True:
+                buffer = buffer.lstrip()
+                if buffer.startswith(','):
+                    buffer = buffer[1:].lstrip()
+                if buffer.startswith(']'):
+                    return
+                if not buffer:
+                    break
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # Elemento incompleto: lê mais um bloco
+                # Um número cortado no fim do bloco ("23" de "234", "1.5" de "1.5e3") também
+                # decodifica: o elemento só está completo quando vem seguido de ',' ou ']'
+                if buffer[end:].lstrip()[:1] not in (',', ']'):
+                    if eof:
+                        raise ValueError("Array JSON inválido ou incompleto.")
+                    break
+                yield item
+                buffer = buffer[end:]
+
+            if eof:
+                raise ValueError("Array JSON incompleto: ']' de fechamento não encontrado.")
 
     def decode_text(self, text):
         """Decodifica texto que contém códigos de escape Unicode."""
@@ -28,16 +182,7 @@ class PrePreprocessor:
 
     def remove_emojis(self, text):
         """Remove emojis do texto usando regex."""
-        emoji_pattern = re.compile("["
-                                   u"\U0001F600-\U0001F64F"  # Emoticons
-                                   u"\U0001F300-\U0001F5FF"  # Símbolos e pictogramas
-                                   u"\U0001F680-\U0001F6FF"  # Transporte e símbolos de mapas
-                                   u"\U0001F1E0-\U0001F1FF"  # Bandeiras (sinalizadores)
-                                   u"\U00002500-\U00002BEF"  # Símbolos diversos
-                                   u"\U00002702-\U000027B0"  # Mais símbolos diversos
-                                   u"\U000024C2-\U0001F251"  # Letras circundadas
-                                   "]+", flags=re.UNICODE)
-        return emoji_pattern.sub(r'', text)
+        return EMOJI_REGEX.sub('', text)
 
     def preprocess_hashtags(self, hashtags):
         """Preprocessa as hashtags, removendo o símbolo #."""
@@ -53,31 +198,106 @@ class PrePreprocessor:
     #     words = wordninja.split(text)
     #     return ' '.join(words)
     
-    def preprocess_text(self, text):
-        """Realiza o pré-processamento no texto."""
-        
-        stemmer = PorterStemmer()
-        
-        text = self.decode_text(text)
-        text = self.remove_emojis(text)
-        text = text.replace('\n', '')  # Remove quebras de linha (\n)
-        text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)  # Remove URLs
-        text = re.sub(r"@\w+", "", text)  # Remove menções
-        text = re.sub(r"[^\w\s]", "", text)  # Remove pontuação
-        text = text.lower()  # Converte para minúsculas
-        
-        # Processa o texto usando o SpaCy
-        doc = self.nlp(text)
+    def normalize_text(self, text):
+        """Limpa o texto (emojis, URLs, menções, pontuação) antes do SpaCy."""
+        # A ordem das etapas importa: remover um emoji ou uma URL pode juntar trechos do texto.
+        # Juntar as etapas numa única regex com alternativas deixa o `re` mais lento do que
+        # passadas separadas por classes de caracteres, então elas seguem separadas, e as
+        # etapas de URL e menção são puladas quando o texto não tem como casar com elas.
+        text = EMOJI_REGEX.sub('', text).replace('\n', '')  # Remove emojis e quebras de linha (\n)
+        if 'http' in text or 'www' in text:
+            text = URL_REGEX.sub('', text)  # Remove URLs
+        if '@' in text:
+            text = MENTION_REGEX.sub('', text)  # Remove menções
+        text = PUNCTUATION_REGEX.sub('', text)  # Remove pontuação
+        return text.lower()  # Converte para minúsculas
 
+    def tokens_from_doc(self, doc):
+        """Extrai os tokens lematizados e com stemming de um Doc do SpaCy."""
         # Extrai tokens relevantes (lematizados e removendo stopwords e pontuação)
         lemmas = [
             token.lemma_ for token in doc if not token.is_stop and not token.is_punct
         ]
 
         # Realiza o stemming nos tokens lematizados (3° melhoria do pre-proc, pois sem o steamming, alguns topicos vieram enviesados)
-        stemmed_tokens = [stemmer.stem(token) for token in lemmas]
+        stemmed_tokens = [self.stem(token) for token in lemmas]
         return " ".join(stemmed_tokens)
 
+    def preprocess_text(self, text):
+        """Realiza o pré-processamento no texto."""
+        if self.cache is not None:
+            key = self.cache.key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.incr("preprocess_cache_hits")
+                return cached
+            self.metrics.incr("preprocess_cache_misses")
+
+        with self.metrics.timer("preprocess_regex_seconds"):
+            normalized = self.normalize_text(text)
+
+        # Processa o texto usando o SpaCy (o tempo inclui a lematização e o stemming)
+        with self.metrics.timer("preprocess_spacy_seconds"):
+            processed = self.tokens_from_doc(self.nlp(normalized))
+
+        if self.cache is not None:
+            self.cache.set_many([(key, processed)])
+        return processed
+
+    def preprocess_texts(self, texts):
+        """
+        Realiza o pré-processamento de uma lista de textos em lote, usando nlp.pipe.
+        Retorna os textos processados na mesma ordem da entrada.
+        Com o cache habilitado, só os textos novos ou alterados passam pelo SpaCy.
+        """
+        if self.cache is None:
+            return self._preprocess_batch(texts)
+
+        texts = list(texts)
+        keys = [self.cache.key(text) for text in texts]
+        results = self.cache.get_many(keys)
+        self.metrics.incr("preprocess_cache_hits", len(results))
+
+        # Processa apenas os textos ausentes do cache (sem repetir textos iguais)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in results and key not in missing:
+                missing[key] = text
+        if missing:
+            self.metrics.incr("preprocess_cache_misses", len(missing))
+            processed = self._preprocess_batch(missing.values())
+            new_entries = list(zip(missing.keys(), processed))
+            self.cache.set_many(new_entries)
+            results.update(new_entries)
+
+        return [results[key] for key in keys]
+
+    def _preprocess_batch(self, texts):
+        """Processa uma sequência de textos com nlp.pipe, sem consultar o cache."""
+        with self.metrics.timer("preprocess_regex_seconds"):
+            normalized = [self.normalize_text(text) for text in texts]
+
+        # O tempo do SpaCy inclui a lematização e o stemming dos tokens
+        with self.metrics.timer("preprocess_spacy_seconds"):
+            docs = self.nlp.pipe(normalized, batch_size=self.batch_size, n_process=self.n_process)
+            return [self.tokens_from_doc(doc) for doc in docs]
+
+    def stem_cache_stats(self):
+        """Retorna as estatísticas da tabela de memorização lema -> stem."""
+        info = self.stem.cache_info()
+        total = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / total if total else 0.0,
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+        }
+
+    def cache_stats(self):
+        """Retorna as estatísticas do cache de pré-processamento (ou None se desabilitado)."""
+        return self.cache.stats() if self.cache is not None else None
+
 
     def combine_text_fields(self, row):
         """Combina campos de título, texto em mídia e hashtags em uma única string."""
@@ -100,17 +320,41 @@ class PrePreprocessor:
     
     def preprocess_all(self):
         """Aplica o pré-processamento a todas as postagens."""
+        return self.preprocess_rows(self.data)
+
+    def preprocess_rows(self, rows):
+        """
+        Aplica o pré-processamento a uma lista de postagens (alterando-as no lugar).
+        Retorna a lista de mensagens combinadas, na mesma ordem.
+        """
+        with self.metrics.stage("preprocess") as stage:
+            stage.add(len(rows))
+            return self._preprocess_rows(rows)
+
+    def _preprocess_rows(self, rows):
+        """Implementação de preprocess_rows (sem as métricas da etapa)."""
         combined_messages = []
 
-        for row in self.data:
+        # Junta todos os textos (títulos e textos de mídia) para processar em lote
+        texts = []
+        for row in rows:
+            if 'title' in row and row['title']:
+                texts.append(row['title'])
+            if 'text_on_media' in row and row['text_on_media']:
+                texts.extend(text['text_on_media'] for text in row['text_on_media'])
+
+        processed = iter(self.preprocess_texts(texts))
+
+        # Distribui os resultados de volta para cada postagem, na mesma ordem
+        for row in rows:
             # Processa o campo 'title' (título da postagem)
             if 'title' in row and row['title']:
-                row['processed_title'] = self.preprocess_text(row['title'])
+                row['processed_title'] = next(processed)
             
             # Processa o campo 'text_on_media' (texto de mídia)
             if 'text_on_media' in row and row['text_on_media']:
                 row['processed_text_on_media'] = [
-                    self.preprocess_text(text['text_on_media']) for text in row['text_on_media']
+                    next(processed) for _ in row['text_on_media']
                 ]
             
             # Processa o campo 'hashtags' (hashtags da postagem)
@@ -125,6 +369,33 @@ class PrePreprocessor:
         
         return combined_messages
     
+    def preprocess_stream(self, rows, chunk_size=1000):
+        """
+        Pré-processa um iterável de postagens em blocos de `chunk_size`,
+        gerando as mensagens combinadas à medida que cada bloco é processado.
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield from self.preprocess_rows(chunk)
+                chunk = []
+        if chunk:
+            yield from self.preprocess_rows(chunk)
+
+    def preprocess_file(self, input_path, output_path, chunk_size=1000):
+        """
+        Pré-processa um arquivo de postagens (.json ou .jsonl) em modo streaming,
+        escrevendo uma mensagem combinada por linha (JSONL) no arquivo de saída.
+        A memória usada fica limitada ao tamanho do bloco, qualquer que seja o tamanho da entrada.
+        """
+        total = 0
+        with open(output_path, 'w', encoding='utf-8') as out_file:
+            for message in self.preprocess_stream(self.iter_data(input_path), chunk_size):
+                out_file.write(json.dumps(message, ensure_ascii=False) + '\n')
+                total += 1
+        return total
+
     # def preprocess_text_list(self, text_list):
     #     """
     #     Aplica o pré-processamento em uma lista de strings.
@@ -138,9 +409,13 @@ class PrePreprocessor:
     #     return processed_texts
     
     def save_processed_data(self, output_path, processed_data):
-        """Salva os dados processados em um arquivo JSON, no formato adequado."""
+        """Salva os dados processados em um arquivo JSON (ou JSONL, um item por linha)."""
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(processed_data, f, ensure_ascii=False, indent=4)
+            if output_path.endswith('.jsonl'):
+                for item in processed_data:
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            else:
+                json.dump(processed_data, f, ensure_ascii=False, indent=4)
             
     def combine_json_files(self, input_paths, output_path):
         """Combina múltiplos arquivos JSON em um único arquivo JSON."""
@@ -169,4 +444,18 @@ class PrePreprocessor:
         """
         Remove strings vazias de uma lista de strings.
         """
-        return [text for text in text_list if text.strip() != ""]
\ No newline at end of file
+        return [text for text in text_list if text.strip() != ""]
+
+    def remove_duplicates(self, text_list, threshold=0.8, shingle_size=2):
+        """
+        Remove postagens duplicadas e quase duplicadas (repostagens) de uma lista de strings processadas.
+
+        Usa MinHash/LSH sobre n-gramas de tokens, em tempo aproximadamente linear.
+        Retorna a lista de documentos canônicos (primeira ocorrência de cada grupo, na ordem original)
+        e o mapa índice da duplicata -> índice do documento canônico, ambos na lista de entrada.
+        """
+        from .dedup import find_duplicates
+
+        duplicate_map = find_duplicates(text_list, threshold=threshold, shingle_size=shingle_size)
+        canonical = [text for i, text in enumerate(text_list) if i not in duplicate_map]
+        return canonical, duplicate_map
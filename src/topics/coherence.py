@@ -0,0 +1,174 @@
+import numpy as np
+from scipy import sparse
+
+
+def topic_words(topic_model, top_n=None):
+    """Palavras de cada tópico de um modelo BERTopic, no formato {topic_id: [palavras]}."""
+    return {
+        topic: [word for word, _ in words][:top_n]
+        for topic, words in topic_model.get_topics().items()
+    }
+
+
+def _gather(topics, index):
+    """
+    Converte as palavras de cada tópico em índices, numa matriz preenchida (T, K).
+
+    Returns:
+        tuple: (ids dos tópicos, matriz de índices, máscara das posições válidas).
+    """
+    topic_ids = list(topics)
+    k = max((len(words) for words in topics.values()), default=0)
+    positions = np.zeros((len(topic_ids), k), dtype=np.int64)
+    mask = np.zeros((len(topic_ids), k), dtype=bool)
+    for row, topic in enumerate(topic_ids):
+        valid = [index[word] for word in topics[topic] if word in index]
+        positions[row, :len(valid)] = valid
+        mask[row, :len(valid)] = True
+    return topic_ids, positions, mask
+
+
+def _mean_pairwise(similarities, mask):
+    """Média das similaridades entre pares distintos (i < j) de palavras válidas de cada tópico."""
+    k = mask.shape[1]
+    pair_mask = mask[:, :, None] & mask[:, None, :] & np.triu(np.ones((k, k), dtype=bool), 1)
+    counts = pair_mask.sum(axis=(1, 2))
+    sums = np.where(pair_mask, similarities, 0.0).sum(axis=(1, 2))
+    return np.divide(sums, counts, out=np.zeros_like(sums, dtype=np.float64), where=counts > 0)
+
+
+def embedding_coherence(topics, word_vectors):
+    """
+    Coerência de cada tópico como a similaridade de cosseno média entre os pares de palavras,
+    calculada para todos os tópicos de uma vez.
+
+    Equivale a chamar `word2vec_model.wv.similarity` par a par (ignorando palavras fora do
+    vocabulário, e 0.0 para tópicos sem pares), mas com uma única coleta da matriz de embeddings
+    normalizada e um produto de matrizes em lote.
+
+    Args:
+        topics (dict): {topic_id: [palavras]}.
+        word_vectors: KeyedVectors do gensim (ou qualquer objeto com `vectors` e `key_to_index`).
+
+    Returns:
+        dict: {topic_id: coerência}.
+    """
+    topic_ids, positions, mask = _gather(topics, word_vectors.key_to_index)
+    if not topic_ids:
+        return {}
+
+    vectors = np.asarray(word_vectors.vectors, dtype=np.float32)[positions]  # (T, K, d)
+    norms = np.linalg.norm(vectors, axis=2, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarities = vectors @ vectors.transpose(0, 2, 1)  # (T, K, K)
+
+    return dict(zip(topic_ids, _mean_pairwise(similarities, mask).tolist()))
+
+
+class CooccurrenceCounts:
+    def __init__(self, tokenized_docs, vocabulary, window_size=None):
+        """
+        Matriz de coocorrência (esparsa) das palavras dos tópicos, construída uma única vez.
+
+        Cada contexto é um documento inteiro (`window_size=None`) ou uma janela deslizante de
+        `window_size` tokens (passo 1, como no C_v original, que usa janelas de 110).
+
+        Args:
+            tokenized_docs (list): Documentos como listas de tokens.
+            vocabulary (iterable): Palavras a considerar (em geral, as palavras de todos os tópicos).
+            window_size (int): Tamanho da janela deslizante (opcional).
+        """
+        self.index = {word: i for i, word in enumerate(dict.fromkeys(vocabulary))}
+        rows, cols = [], []
+        n_contexts = 0
+
+        for tokens in tokenized_docs:
+            positions = np.array([p for p, token in enumerate(tokens) if token in self.index], dtype=np.int64)
+            n_windows = 1 if window_size is None else max(len(tokens) - window_size + 1, 1)
+            if len(positions):
+                ids = np.array([self.index[tokens[p]] for p in positions], dtype=np.int64)
+                if window_size is None:
+                    rows.append(np.full(len(ids), n_contexts, dtype=np.int64))
+                    cols.append(ids)
+                else:
+                    # A palavra na posição p aparece nas janelas que começam em [p - w + 1, p]
+                    low = np.maximum(positions - window_size + 1, 0)
+                    high = np.minimum(positions, n_windows - 1)
+                    lengths = high - low + 1
+                    starts = np.repeat(low - np.cumsum(lengths) + lengths, lengths)
+                    rows.append(n_contexts + starts + np.arange(lengths.sum()))
+                    cols.append(np.repeat(ids, lengths))
+            n_contexts += n_windows
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        contexts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(n_contexts, len(self.index))
+        )
+        contexts.data[:] = 1.0  # presença binária (duplicatas somadas viram 1)
+
+        self.n_contexts = n_contexts
+        self.cooccurrence = (contexts.T @ contexts).toarray()
+        self.counts = np.diag(self.cooccurrence).copy()
+
+    def npmi_matrix(self, eps=1e-12):
+        """NPMI entre todos os pares de palavras do vocabulário."""
+        n = max(self.n_contexts, 1)
+        p_joint = self.cooccurrence / n
+        p_word = self.counts / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pmi = np.log((p_joint + eps) / np.outer(p_word, p_word))
+            npmi = pmi / -np.log(p_joint + eps)
+        return np.nan_to_num(npmi, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _topic_blocks(self, topics):
+        """Submatrizes de NPMI (T, K, K) das palavras de cada tópico presentes no corpus."""
+        present = {word: i for word, i in self.index.items() if self.counts[i] > 0}
+        topic_ids, positions, mask = _gather(topics, present)
+        npmi = self.npmi_matrix()
+        return topic_ids, npmi[positions[:, :, None], positions[:, None, :]], mask
+
+    def npmi_coherence(self, topics):
+        """Coerência NPMI de cada tópico (média entre os pares de palavras)."""
+        topic_ids, blocks, mask = self._topic_blocks(topics)
+        return dict(zip(topic_ids, _mean_pairwise(blocks, mask).tolist()))
+
+    def cv_coherence(self, topics):
+        """
+        Coerência C_v de cada tópico: cosseno médio entre o vetor de contexto NPMI de cada palavra
+        e o vetor de contexto do tópico inteiro.
+        """
+        topic_ids, blocks, mask = self._topic_blocks(topics)
+        pair_mask = mask[:, :, None] & mask[:, None, :]
+        vectors = np.where(pair_mask, blocks, 0.0)  # (T, K, K): linha i = vetor da palavra i
+        topic_vectors = vectors.sum(axis=1, keepdims=True)  # (T, 1, K)
+
+        dots = (vectors * topic_vectors).sum(axis=2)
+        norms = np.linalg.norm(vectors, axis=2) * np.linalg.norm(topic_vectors, axis=2)
+        cosines = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+        counts = mask.sum(axis=1)
+        sums = np.where(mask, cosines, 0.0).sum(axis=1)
+        scores = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        return dict(zip(topic_ids, scores.tolist()))
+
+
+def evaluate_topics(topics, tokenized_docs, word_vectors=None, window_size=110):
+    """
+    Calcula as métricas de coerência de todos os tópicos de uma configuração.
+
+    Args:
+        topics (dict): {topic_id: [palavras]}.
+        tokenized_docs (list): Documentos como listas de tokens.
+        word_vectors: KeyedVectors para a coerência por embeddings (opcional).
+        window_size (int): Janela deslizante do C_v (None usa o documento inteiro).
+
+    Returns:
+        dict: {topic_id: {"npmi": ..., "c_v": ..., "embedding": ...}}.
+    """
+    vocabulary = [word for words in topics.values() for word in words]
+    counts = CooccurrenceCounts(tokenized_docs, vocabulary, window_size=window_size)
+    metrics = {"npmi": counts.npmi_coherence(topics), "c_v": counts.cv_coherence(topics)}
+    if word_vectors is not None:
+        metrics["embedding"] = embedding_coherence(topics, word_vectors)
+    return {topic: {name: values[topic] for name, values in metrics.items()} for topic in topics}
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def document_hash(text):
+    """Hash do conteúdo de um documento, usado como chave no repositório de embeddings."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, path, model_name=DEFAULT_EMBEDDING_MODEL, dtype="float32", batch_size=64):
+        """
+        Repositório em disco dos embeddings dos documentos, lido via memória mapeada.
+
+        Os vetores ficam num arquivo binário contínuo (`vectors.bin`), ao qual as linhas novas são
+        acrescentadas no fim; o índice `index.json` associa o hash de cada documento à sua linha.
+        Assim, só os documentos novos desde a última execução passam pelo SentenceTransformer.
+
+        Args:
+            path (str): Diretório do repositório.
+            model_name (str): Modelo do SentenceTransformer usado para gerar os embeddings.
+            dtype (str): "float32" ou "float16" (metade do espaço em disco).
+            batch_size (int): Tamanho do lote enviado ao modelo.
+        """
+        self.path = path
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.batch_size = batch_size
+        self._model = None
+
+        os.makedirs(path, exist_ok=True)
+        self.vectors_path = os.path.join(path, "vectors.bin")
+        self.index_path = os.path.join(path, "index.json")
+
+        self.index = {}
+        self.dim = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta["model"] != model_name or meta["dtype"] != self.dtype.name:
+                raise ValueError(
+                    f"O repositório em {path} foi criado com {meta['model']} ({meta['dtype']}), "
+                    f"não com {model_name} ({self.dtype.name})."
+                )
+            self.index = meta["index"]
+            self.dim = meta["dim"]
+
+    @property
+    def model(self):
+        """SentenceTransformer, carregado só quando há documentos novos para codificar."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def __len__(self):
+        return len(self.index)
+
+    def vectors(self):
+        """Todos os vetores armazenados, como um array em memória mapeada (somente leitura)."""
+        n_rows = self._stored_rows()
+        if not n_rows:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode='r', shape=(n_rows, self.dim))
+
+    def _stored_rows(self):
+        """Número de linhas completas no arquivo de vetores (pode haver linhas órfãs de uma execução interrompida)."""
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * self.dtype.itemsize)
+
+    def add(self, docs):
+        """
+        Codifica e armazena os documentos que ainda não estão no repositório.
+
+        Returns:
+            int: Número de documentos novos codificados.
+        """
+        new_docs = {}
+        for doc in docs:
+            key = document_hash(doc)
+            if key not in self.index and key not in new_docs:
+                new_docs[key] = doc
+        if not new_docs:
+            return 0
+
+        embeddings = self.model.encode(
+            list(new_docs.values()), batch_size=self.batch_size, show_progress_bar=False, convert_to_numpy=True
+        ).astype(self.dtype)
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+
+        # Acrescenta as linhas novas ao fim do arquivo e só então atualiza o índice
+        start = self._stored_rows()
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(start * self.dim * self.dtype.itemsize)  # descarta uma linha parcial, se houver
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+        for offset, key in enumerate(new_docs):
+            self.index[key] = start + offset
+        self._save_index()
+        return len(new_docs)
+
+    def get(self, docs):
+        """
+        Retorna os embeddings dos documentos, na mesma ordem, codificando antes os que faltarem.
+
+        Returns:
+            np.ndarray: Matriz (n_docs, dim) em float32, pronta para o BERTopic.
+        """
+        self.add(docs)
+        rows = np.fromiter((self.index[document_hash(doc)] for doc in docs), dtype=np.int64, count=len(docs))
+        return np.asarray(self.vectors()[rows], dtype=np.float32)
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"model": self.model_name, "dtype": self.dtype.name, "dim": self.dim, "index": self.index}, f)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,165 @@
+from collections import Counter
+import numpy as np
+
+from .modeling import bertopic_model
+
+
+def topic_distribution(counts, topic_ids):
+    """Distribuição de frequência dos tópicos (a partir das contagens por tópico), na ordem de `topic_ids`."""
+    values = np.array([counts.get(topic, 0) for topic in topic_ids], dtype=np.float64)
+    total = values.sum()
+    return values / total if total else values
+
+
+def jensen_shannon(p, q):
+    """Divergência de Jensen-Shannon (base 2, entre 0 e 1) entre duas distribuições."""
+    m = (p + q) / 2
+
+    def kl(a, b):
+        mask = a > 0
+        return float(np.sum(a[mask] * np.log2(a[mask] / b[mask])))
+
+    return (kl(p, m) + kl(q, m)) / 2
+
+
+def drift_baseline(reference, n, samples=200, quantile=0.95, seed=42):
+    """
+    Divergência de Jensen-Shannon esperada só pelo ruído de amostragem.
+
+    Sorteia `samples` amostras de `n` documentos da própria distribuição de referência (sem desvio
+    real nenhum) e retorna o quantil `quantile` das divergências. Com poucos documentos e muitos
+    tópicos esse valor é alto (por exemplo, ~0,2 para 50 postagens em 90 tópicos).
+
+    Args:
+        reference (np.ndarray): Distribuição de referência (soma 1).
+        n (int): Tamanho da amostra avaliada.
+        samples (int): Número de amostras sorteadas.
+        quantile (float): Quantil usado como limite do ruído.
+        seed (int): Semente do sorteio, para resultados reproduzíveis.
+    """
+    if n <= 0 or not reference.sum():
+        return 0.0
+    draws = np.random.default_rng(seed).multinomial(n, reference, size=samples)
+    return float(np.quantile([jensen_shannon(reference, draw / n) for draw in draws], quantile))
+
+
+class IncrementalTopicAssigner:
+    def __init__(self, model_path, store, batch_size=1000, max_outlier_ratio=0.3, max_drift=0.05,
+                 min_sample=200):
+        """
+        Atribui tópicos a postagens novas com um modelo BERTopic já treinado, sem refazer o ajuste.
+
+        As postagens passam pelo `transform` do modelo salvo em lotes, usando os embeddings do
+        repositório (só as postagens novas são codificadas). Um ajuste completo só é indicado quando
+        a proporção de outliers ou o desvio da distribuição de tópicos passa dos limites.
+
+        O desvio é medido acima do ruído de amostragem (ver `drift_baseline`): uma coleta pequena
+        tirada da mesma distribuição do treino já diverge bastante dela só por acaso. Abaixo de
+        `min_sample` postagens nenhum limite é testado; para isso, passe todas as postagens
+        acumuladas desde o último ajuste, e não só as da última coleta.
+
+        Args:
+            model_path (str): Caminho do modelo salvo com `topic_model.save(...)`.
+            store (EmbeddingStore): Repositório de embeddings dos documentos.
+            batch_size (int): Número de documentos por chamada a `transform`.
+            max_outlier_ratio (float): Proporção máxima de documentos no tópico -1.
+            max_drift (float): Divergência de Jensen-Shannon máxima, acima do ruído de amostragem,
+                entre a distribuição de tópicos do treino e a das postagens novas.
+            min_sample (int): Número mínimo de postagens novas para avaliar os limites.
+        """
+        self.model_path = model_path
+        self.store = store
+        self.batch_size = batch_size
+        self.max_outlier_ratio = max_outlier_ratio
+        self.max_drift = max_drift
+        self.min_sample = min_sample
+        self._model = None
+
+    @property
+    def model(self):
+        """Modelo BERTopic salvo, carregado no primeiro uso."""
+        if self._model is None:
+            from bertopic import BERTopic
+            self._model = BERTopic.load(self.model_path, embedding_model=self.store.model_name)
+        return self._model
+
+    def transform(self, docs):
+        """
+        Atribui tópicos aos documentos, em lotes, com os embeddings do repositório.
+
+        Returns:
+            tuple: (topics, probs) na mesma ordem dos documentos.
+        """
+        topics, probs = [], []
+        for start in range(0, len(docs), self.batch_size):
+            batch = docs[start:start + self.batch_size]
+            batch_topics, batch_probs = self.model.transform(batch, self.store.get(batch))
+            topics.extend(batch_topics)
+            if batch_probs is not None:
+                probs.append(np.asarray(batch_probs))
+        return topics, (np.concatenate(probs) if probs else None)
+
+    def assign(self, docs):
+        """
+        Atribui tópicos às postagens novas e avalia se o modelo ainda as representa bem.
+
+        Returns:
+            dict: topics, probs, outlier_ratio, drift, drift_noise (divergência esperada só pelo
+            ruído de amostragem) e needs_refit.
+        """
+        topics, probs = self.transform(docs)
+
+        outlier_ratio = sum(1 for topic in topics if topic == -1) / len(topics) if topics else 0.0
+
+        # Compara com a distribuição de tópicos do treino (inclui o tópico -1)
+        reference = self.model.topic_sizes_
+        counts = Counter(topics)
+        topic_ids = sorted(set(reference) | set(counts))
+        reference_dist = topic_distribution(reference, topic_ids)
+        drift = jensen_shannon(reference_dist, topic_distribution(counts, topic_ids)) if topics else 0.0
+        drift_noise = drift_baseline(reference_dist, len(topics))
+
+        enough = len(topics) >= self.min_sample
+        return {
+            "topics": topics,
+            "probs": probs,
+            "outlier_ratio": outlier_ratio,
+            "drift": drift,
+            "drift_noise": drift_noise,
+            "needs_refit": enough and (outlier_ratio > self.max_outlier_ratio
+                                       or drift - drift_noise > self.max_drift),
+        }
+
+    def refit(self, all_docs, **kwargs):
+        """
+        Refaz o ajuste completo sobre todo o corpus (reaproveitando os embeddings) e salva o modelo.
+
+        Returns:
+            tuple: (topics, probs) do novo ajuste.
+        """
+        topics, probs, self._model = bertopic_model(all_docs, embeddings=self.store.get(all_docs),
+                                                    embedding_model=self.store.model_name, **kwargs)
+        self._model.save(self.model_path)
+        return topics, probs
+
+    def update(self, new_docs, all_docs=None, **kwargs):
+        """
+        Processa uma coleta nova: atribui os tópicos e, se os limites forem ultrapassados e o corpus
+        completo for informado, refaz o ajuste.
+
+        Returns:
+            dict: O resultado de `assign`, com `refitted` indicando se houve novo ajuste e, nesse
+            caso, `all_topics` com os tópicos de todo o corpus no novo modelo.
+        """
+        result = self.assign(new_docs)
+        result["refitted"] = False
+        if result["needs_refit"] and all_docs is not None:
+            topics, probs = self.refit(all_docs, **kwargs)
+            # Os tópicos das postagens novas passam a vir do novo modelo
+            positions = {doc: i for i, doc in enumerate(all_docs)}
+            rows = [positions[doc] for doc in new_docs]
+            result["topics"] = [topics[i] for i in rows]
+            result["probs"] = np.asarray(probs)[rows] if probs is not None else None
+            result["all_topics"] = topics
+            result["refitted"] = True
+        return result
@@ -0,0 +1,91 @@
+from .embeddings import DEFAULT_EMBEDDING_MODEL
+
+
+def bertopic_model(docs, stop_words=None,
+                   n_neighbors=15, n_components=5,
+                   min_dist=0.0, hdbscan_min_cluster_size=15,
+                   embedding_model=DEFAULT_EMBEDDING_MODEL, *, embeddings=None):
+    """
+    Create and fit a BERTopic model.
+
+    Parameters:
+    - docs: List of documents to be processed.
+    - stop_words: List of stop words to be removed. Default is None.
+    - n_neighbors: Number of neighbors to consider for UMAP. Default is 15.
+    - n_components: Number of components for UMAP. Default is 5.
+    - min_dist: Minimum distance for UMAP. Default is 0.0.
+    - hdbscan_min_cluster_size: Minimum cluster size for HDBSCAN. Default is 15.
+    - embedding_model: SentenceTransformer model name (or instance), still used by KeyBERTInspired
+      to embed topic keywords. Default is paraphrase-multilingual-MiniLM-L12-v2.
+    - embeddings: Precomputed document embeddings (e.g. from EmbeddingStore.get), keyword-only.
+      Default is None, in which case BERTopic encodes the documents itself.
+
+    Returns:
+    - topics: Topic assignments for each document.
+    - probs: Probability of each document belonging to its assigned topic.
+    - topic_model: The fitted BERTopic model.
+    """
+    from umap import UMAP
+    from hdbscan import HDBSCAN
+    from sentence_transformers import SentenceTransformer
+    from sklearn.feature_extraction.text import CountVectorizer
+    from bertopic import BERTopic
+    from bertopic.representation import KeyBERTInspired
+    from bertopic.vectorizers import ClassTfidfTransformer
+
+    # Step 1 - Extract embeddings
+    if isinstance(embedding_model, str):
+        embedding_model = SentenceTransformer(embedding_model)
+
+    # Step 2 - Reduce dimensionality
+    umap_model = UMAP(n_neighbors=n_neighbors, n_components=n_components, min_dist=min_dist, metric='cosine')
+
+    # Step 3 - Cluster reduced embeddings
+    hdbscan_model = HDBSCAN(min_cluster_size=hdbscan_min_cluster_size,
+                            metric='euclidean',
+                            cluster_selection_method='eom',
+                            prediction_data=True)
+
+    # Step 4 - Tokenize topics
+    vectorizer_model = CountVectorizer(stop_words=stop_words)
+
+    # Step 5 - Create topic representation
+    ctfidf_model = ClassTfidfTransformer()
+
+    # Step 6 - Fine-tune topic representations with a `bertopic.representation` model
+    representation_model = KeyBERTInspired()
+
+    # All steps together
+    model = BERTopic(
+        embedding_model=embedding_model,          # Step 1 - Extract embeddings
+        umap_model=umap_model,                    # Step 2 - Reduce dimensionality
+        hdbscan_model=hdbscan_model,              # Step 3 - Cluster reduced embeddings
+        vectorizer_model=vectorizer_model,        # Step 4 - Tokenize topics
+        ctfidf_model=ctfidf_model,                # Step 5 - Extract topic words
+        representation_model=representation_model  # Step 6 - Fine-tune topic representations
+    )
+
+    # Fit the model (with precomputed embeddings, the documents are not encoded again)
+    topics, probs = model.fit_transform(docs, embeddings)
+
+    return topics, probs, model
+
+
+def refit_outliers(docs, topics, store, stop_words=None, **kwargs):
+    """
+    Fit a new BERTopic model on the outlier documents (topic == -1), reusing their stored embeddings.
+
+    Parameters:
+    - docs: Documents used in the original fit.
+    - topics: Topic assignments returned by the original fit.
+    - store: EmbeddingStore holding the embeddings of `docs`.
+    - stop_words: List of stop words to be removed. Default is None.
+    - kwargs: Extra parameters forwarded to bertopic_model.
+
+    Returns:
+    - outlier_docs: The outlier documents.
+    - topics, probs, topic_model: As returned by bertopic_model.
+    """
+    outlier_docs = [doc for doc, topic in zip(docs, topics) if topic == -1]
+    embeddings = store.get(outlier_docs)
+    return (outlier_docs, *bertopic_model(outlier_docs, stop_words=stop_words, embeddings=embeddings, **kwargs))
@@ -0,0 +1,151 @@
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .coherence import evaluate_topics
+
+UMAP_PARAMS = ("n_neighbors", "n_components", "min_dist")
+RESULT_COLUMNS = [
+    "n_neighbors", "n_components", "min_dist", "hdbscan_min_cluster_size",
+    "n_topics", "outlier_ratio", "npmi", "c_v", "umap_seconds", "fit_seconds", "wall_seconds",
+]
+
+
+def expand_grid(grid):
+    """Gera todas as combinações de um dicionário {parâmetro: [valores]}."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _umap_key(embeddings_key, umap_params, random_state):
+    config = json.dumps({"embeddings": embeddings_key, "random_state": random_state, **umap_params}, sort_keys=True)
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+
+def _reduce(embeddings_path, reduced_path, umap_params, random_state):
+    """Roda o UMAP uma vez para um conjunto de parâmetros e salva a redução em disco."""
+    from umap import UMAP
+
+    start = time.perf_counter()
+    if not os.path.exists(reduced_path):
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+        reduced = UMAP(metric='cosine', random_state=random_state, **umap_params).fit_transform(embeddings)
+        tmp_path = reduced_path + ".tmp.npy"
+        np.save(tmp_path, reduced.astype(np.float32))
+        os.replace(tmp_path, reduced_path)
+    return time.perf_counter() - start
+
+
+def _fit(docs, reduced_path, config, stop_words, top_n_words):
+    """Ajusta o BERTopic sobre uma redução já calculada e mede o resultado da configuração."""
+    from hdbscan import HDBSCAN
+    from sklearn.feature_extraction.text import CountVectorizer
+    from bertopic import BERTopic
+    from bertopic.dimensionality import BaseDimensionalityReduction
+    from bertopic.vectorizers import ClassTfidfTransformer
+
+    start = time.perf_counter()
+    reduced = np.load(reduced_path, mmap_mode='r')
+    model = BERTopic(
+        umap_model=BaseDimensionalityReduction(),  # a redução já foi feita (e está em cache)
+        hdbscan_model=HDBSCAN(min_cluster_size=config["hdbscan_min_cluster_size"],
+                              metric='euclidean',
+                              cluster_selection_method='eom',
+                              prediction_data=True),
+        vectorizer_model=CountVectorizer(stop_words=stop_words),
+        ctfidf_model=ClassTfidfTransformer(),
+        top_n_words=top_n_words,
+    )
+    topics, _ = model.fit_transform(docs, np.asarray(reduced))
+    fit_seconds = time.perf_counter() - start
+
+    words = {
+        topic: [word for word, _ in model.get_topic(topic)]
+        for topic in set(topics) if topic != -1
+    }
+    coherence = evaluate_topics(words, [doc.split() for doc in docs]) if words else {}
+
+    return {
+        **config,
+        "n_topics": len(words),
+        "outlier_ratio": sum(1 for topic in topics if topic == -1) / len(topics),
+        "npmi": float(np.mean([c["npmi"] for c in coherence.values()])) if coherence else 0.0,
+        "c_v": float(np.mean([c["c_v"] for c in coherence.values()])) if coherence else 0.0,
+        "fit_seconds": fit_seconds,
+    }
+
+
+def run_sweep(docs, embeddings, grid, cache_dir, results_path, stop_words=None,
+              n_jobs=None, random_state=42, top_n_words=10):
+    """
+    Avalia várias configurações do bertopic_model em paralelo, compartilhando os embeddings.
+
+    As reduções do UMAP são calculadas uma vez por combinação de (n_neighbors, n_components,
+    min_dist) e guardadas em `cache_dir`; configurações que diferem só no HDBSCAN as reaproveitam,
+    inclusive entre execuções. Os embeddings são gravados uma vez em disco e lidos pelos processos
+    via memória mapeada, sem cópia por configuração.
+
+    Args:
+        docs (list): Documentos processados.
+        embeddings (np.ndarray): Embeddings pré-calculados dos documentos (ver EmbeddingStore).
+        grid (dict): Valores a testar de n_neighbors, n_components, min_dist e hdbscan_min_cluster_size.
+        cache_dir (str): Diretório dos embeddings compartilhados e das reduções do UMAP.
+        results_path (str): Arquivo CSV com uma linha por configuração.
+        stop_words (list): Stop words do CountVectorizer (opcional).
+        n_jobs (int): Número de processos (padrão: número de CPUs).
+        random_state (int): Semente do UMAP, para reduções reproduzíveis.
+        top_n_words (int): Palavras por tópico usadas na coerência.
+
+    Returns:
+        list: Resultados de cada configuração (os mesmos gravados no CSV).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    embeddings_key = hashlib.sha256(embeddings.tobytes()).hexdigest()[:16]
+    embeddings_path = os.path.join(cache_dir, f"embeddings_{embeddings_key}.npy")
+    if not os.path.exists(embeddings_path):
+        np.save(embeddings_path, embeddings)
+
+    configs = expand_grid(grid)
+    reductions = {}
+    for config in configs:
+        umap_params = {name: config[name] for name in UMAP_PARAMS}
+        key = _umap_key(embeddings_key, umap_params, random_state)
+        reductions[key] = (os.path.join(cache_dir, f"umap_{key}.npy"), umap_params)
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        # Etapa 1: uma redução do UMAP por combinação de parâmetros
+        umap_futures = {
+            key: executor.submit(_reduce, embeddings_path, path, params, random_state)
+            for key, (path, params) in reductions.items()
+        }
+        umap_seconds = {key: future.result() for key, future in umap_futures.items()}
+
+        # Etapa 2: um ajuste por configuração, sobre a redução correspondente
+        fit_futures = []
+        for config in configs:
+            umap_params = {name: config[name] for name in UMAP_PARAMS}
+            key = _umap_key(embeddings_key, umap_params, random_state)
+            fit_futures.append((key, executor.submit(
+                _fit, docs, reductions[key][0], config, stop_words, top_n_words
+            )))
+
+        results = []
+        for key, future in fit_futures:
+            result = future.result()
+            result["umap_seconds"] = umap_seconds[key]
+            result["wall_seconds"] = result["umap_seconds"] + result["fit_seconds"]
+            results.append(result)
+
+    with open(results_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    return results